@@ -1,23 +1,37 @@
 from __future__ import annotations
 
 import re
+import threading
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import duckdb
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from footballdata.config import settings
-from footballdata.extract.odds_api import OddsAPIError, OddsAPIHTTPError, OddsAPIMeta, fetch_champions_league_odds
+from footballdata.extract.odds_api import (
+    OddsAPIError,
+    OddsAPIHTTPError,
+    OddsAPIMeta,
+    fetch_champions_league_odds,
+    summarize_odds_consensus,
+)
 
 st.set_page_config(page_title="FootballData Dashboard", layout="wide")
 
 
 DEBUG_ODDS = st.sidebar.checkbox("Debug odds matching", value=False)
-if "odds_cache" not in st.session_state:
-    st.session_state["odds_cache"] = None
+
+ODDS_REGIONS = "eu"
+ODDS_MARKETS = ("h2h", "totals")
+ODDS_CACHE_MAX_AGE = pd.Timedelta(hours=6)
 
 
 @st.cache_resource
@@ -25,15 +39,45 @@ def get_con():
     return duckdb.connect("warehouse/warehouse.duckdb", read_only=True)
 
 
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504], raise_on_status=False)
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+    return session
+
+
+_RE_TOKENS = re.compile(r"\b(fc|cf|ac|afc|sc|fk|bk|sk|sv|ud|cd|club|the)\b")
+_RE_NONALNUM = re.compile(r"[^a-z0-9]+")
+_RE_WS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
 def _normalize_team_name(name: str | None) -> str:
     if not name:
         return ""
     text = unicodedata.normalize("NFKD", name)
-    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.encode("ascii", "ignore").decode("ascii")
     text = text.lower()
-    text = re.sub(r"\b(fc|cf|ac|afc|sc|fk|bk|sk|sv|ud|cd|club|the)\b", " ", text)
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+    text = _RE_TOKENS.sub(" ", text)
+    text = _RE_NONALNUM.sub(" ", text)
+    return _RE_WS.sub(" ", text).strip()
+
+
+def _normalize_team_series(names: pd.Series) -> pd.Series:
+    """Vectorized counterpart of _normalize_team_name for whole columns."""
+    return (
+        names.fillna("")
+        .astype(str)
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace(_RE_TOKENS, " ", regex=True)
+        .str.replace(_RE_NONALNUM, " ", regex=True)
+        .str.replace(_RE_WS, " ", regex=True)
+        .str.strip()
+    )
 
 
 TEAM_STOPWORDS = {
@@ -73,6 +117,7 @@ TEAM_ALIASES = {
     "kairat almaty": "kairat",
     "kobenhavn": "copenhagen",
     "k benhavn": "copenhagen",
+    "kbenhavn": "copenhagen",
     "fc copenhagen": "copenhagen",
     "athletic": "athletic bilbao",
     "athletic club": "athletic bilbao",
@@ -95,8 +140,8 @@ TEAM_ALIASES = {
 }
 
 
-def _team_key(name: str | None) -> str:
-    norm = _normalize_team_name(name)
+@lru_cache(maxsize=4096)
+def _team_key_from_norm(norm: str) -> str:
     if norm in TEAM_ALIASES:
         norm = TEAM_ALIASES[norm]
     if not norm:
@@ -113,6 +158,14 @@ def _team_key(name: str | None) -> str:
     return " ".join(sorted(tokens))
 
 
+def _team_key(name: str | None) -> str:
+    return _team_key_from_norm(_normalize_team_name(name))
+
+
+def _team_key_series(names: pd.Series) -> pd.Series:
+    return _normalize_team_series(names).map(_team_key_from_norm)
+
+
 @st.cache_data(ttl=1800)
 def get_upcoming_cl_matches():
     headers = {"Accept": "application/json"}
@@ -121,7 +174,7 @@ def get_upcoming_cl_matches():
     url = f"{settings.FOOTBALL_DATA_BASE_URL.rstrip('/')}/competitions/CL/matches"
     params = {"status": "SCHEDULED"}
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=30)
+        resp = get_http_session().get(url, headers=headers, params=params, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as exc:
         st.warning(f"Não foi possível buscar a próxima rodada da API Football-Data: {exc}")
@@ -131,7 +184,7 @@ def get_upcoming_cl_matches():
     if not matches:
         return pd.DataFrame()
     df = pd.json_normalize(matches)
-    df["utcDate"] = pd.to_datetime(df["utcDate"], utc=True, errors="coerce")
+    df["utcDate"] = pd.to_datetime(df["utcDate"], utc=True, errors="coerce", format="ISO8601")
     df.rename(
         columns={
             "homeTeam.name": "home_team",
@@ -171,108 +224,228 @@ def get_upcoming_cl_matches():
     ]
 
 
+ODDS_COLUMNS = [
+    "event_id",
+    "commence_time",
+    "home_team",
+    "away_team",
+    "market_key",
+    "outcome_name",
+    "outcome_point",
+    "price_median",
+    "bookmaker_count",
+    "last_update",
+]
+
+
+def _hash_frame(df: pd.DataFrame) -> tuple:
+    return (len(df), tuple(df.columns), int(pd.util.hash_pandas_object(df, index=False).sum()))
+
+
+_FRAME_HASH_FUNCS = {pd.DataFrame: _hash_frame}
+
+
+def _odds_columns(odds_df: pd.DataFrame) -> pd.DataFrame:
+    if odds_df.empty:
+        return odds_df
+    return odds_df[ODDS_COLUMNS]
+
+
+@st.cache_data(ttl=600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
 def _build_odds_overview(odds_df: pd.DataFrame) -> pd.DataFrame:
     if odds_df.empty:
         return pd.DataFrame()
+    markets = (
+        odds_df.loc[odds_df["market_key"].notna(), ["event_id", "market_key"]]
+        .drop_duplicates()
+        .sort_values(["event_id", "market_key"])
+        .groupby("event_id", sort=False, observed=True)["market_key"]
+        .agg(", ".join)
+    )
     overview = (
-        odds_df.groupby("event_id")
+        odds_df.groupby("event_id", sort=False, observed=True)
         .agg(
             commence_time=("commence_time", "max"),
             home_team=("home_team", "first"),
             away_team=("away_team", "first"),
-            markets=("market_key", lambda x: ", ".join(sorted(set(x.dropna())))),
-            bookmakers=("bookmaker_key", lambda x: x.nunique()),
+            bookmakers=("bookmaker_count", "max"),
         )
+        .assign(markets=markets)
+        .fillna({"markets": ""})
         .reset_index()
-    )
-    overview["home_norm"] = overview["home_team"].apply(_normalize_team_name)
-    overview["away_norm"] = overview["away_team"].apply(_normalize_team_name)
-    overview["home_key"] = overview["home_team"].apply(_team_key)
-    overview["away_key"] = overview["away_team"].apply(_team_key)
+    )[["event_id", "commence_time", "home_team", "away_team", "markets", "bookmakers"]]
+    overview["home_norm"] = _normalize_team_series(overview["home_team"])
+    overview["away_norm"] = _normalize_team_series(overview["away_team"])
+    overview["home_key"] = overview["home_norm"].map(_team_key_from_norm)
+    overview["away_key"] = overview["away_norm"].map(_team_key_from_norm)
     return overview
 
 
+def _filter_fixture_odds(
+    odds_df: pd.DataFrame,
+    odds_overview: pd.DataFrame,
+    home_key: str,
+    away_key: str,
+) -> pd.DataFrame:
+    """Keep only the odds rows of events whose team keys match the fixture."""
+    if odds_overview.empty:
+        return odds_df
+    event_ids = odds_overview.loc[
+        (odds_overview["home_key"] == home_key) & (odds_overview["away_key"] == away_key),
+        "event_id",
+    ]
+    return odds_df[odds_df["event_id"].isin(event_ids)]
+
+
+@st.cache_resource
+def _odds_cache_store() -> tuple[dict, threading.Lock]:
+    """Last successful odds payload per (regions, markets), shared by every session, and its lock."""
+    return {}, threading.Lock()
+
+
+def _prune_odds_cache(cache: dict, now: pd.Timestamp) -> None:
+    # Caller holds the lock; expired entries are dropped on every access so they can't pile up.
+    for key in [key for key, entry in cache.items() if entry["expires_at"] < now]:
+        del cache[key]
+
+
+def _odds_cache_put(key: tuple, entry: dict) -> None:
+    cache, lock = _odds_cache_store()
+    with lock:
+        _prune_odds_cache(cache, entry["captured_at"])
+        cache[key] = entry
+
+
+def _odds_cache_get(key: tuple) -> dict | None:
+    cache, lock = _odds_cache_store()
+    with lock:
+        _prune_odds_cache(cache, pd.Timestamp.now(tz="UTC"))
+        return cache.get(key)
+
+
+def _fetch_markets_separately(markets: tuple[str, ...]) -> tuple[pd.DataFrame, OddsAPIMeta, tuple[str, ...]]:
+    """Request each market on its own, in parallel, keeping those the API accepts."""
+    with ThreadPoolExecutor(max_workers=len(markets)) as executor:
+        futures = {
+            market: executor.submit(fetch_champions_league_odds, regions=ODDS_REGIONS, markets=(market,))
+            for market in markets
+        }
+    frames: list[pd.DataFrame] = []
+    metas: list[OddsAPIMeta] = []
+    used_markets: list[str] = []
+    rejected: OddsAPIHTTPError | None = None
+    for market, future in futures.items():
+        try:
+            df, meta = future.result()
+        except OddsAPIHTTPError as exc:
+            if exc.status_code != 422:
+                raise
+            rejected = rejected or exc
+            continue
+        frames.append(df)
+        metas.append(meta)
+        used_markets.append(market)
+    if not frames:
+        raise rejected
+    # The response with the fewest remaining requests carries the most recent quota.
+    meta = min(
+        metas,
+        key=lambda m: m.requests_remaining if m.requests_remaining is not None else float("inf"),
+    )
+    return pd.concat(frames, ignore_index=True), meta, tuple(used_markets)
+
+
 @st.cache_data(ttl=600)
 def get_cl_odds_data():
-    requested_markets = ("h2h", "totals")
+    requested_markets = ODDS_MARKETS
     try:
-        df, meta = fetch_champions_league_odds(regions="eu", markets=requested_markets)
+        df, meta = fetch_champions_league_odds(regions=ODDS_REGIONS, markets=requested_markets)
         used_markets = requested_markets
     except OddsAPIHTTPError as exc:
         if exc.status_code == 422 and len(requested_markets) > 1:
-            fallback_markets = ("h2h",)
-            df, meta = fetch_champions_league_odds(regions="eu", markets=fallback_markets)
-            used_markets = fallback_markets
+            df, meta, used_markets = _fetch_markets_separately(requested_markets)
         else:
             raise
-    return df, meta, used_markets
+    return summarize_odds_consensus(df), meta, used_markets
 
 
-def build_moneyline_summary(fixtures_df: pd.DataFrame, odds_df: pd.DataFrame) -> pd.DataFrame:
-    if fixtures_df.empty or odds_df.empty:
-        return pd.DataFrame()
+MATCH_INFO_COLUMNS = ["matchday", "stage", "kickoff_local", "fixture_home_team", "fixture_away_team"]
+
 
-    fixtures = fixtures_df.copy()
-    fixtures["home_key"] = fixtures["home_team"].apply(_team_key)
-    fixtures["away_key"] = fixtures["away_team"].apply(_team_key)
+def _merge_on_team_keys(odds: pd.DataFrame, fixtures: pd.DataFrame) -> pd.DataFrame:
+    """Inner-join odds onto fixtures, casting both key pairs to one shared categorical dtype."""
+    keys = ["home_key", "away_key"]
+    key_dtype = pd.CategoricalDtype(pd.unique(pd.concat([odds[k] for k in keys] + [fixtures[k] for k in keys])))
+    odds = odds.astype({k: key_dtype for k in keys})
+    fixtures = fixtures.astype({k: key_dtype for k in keys})
+    return odds.merge(fixtures, on=keys, how="inner", validate="many_to_one")
 
-    odds = odds_df.copy()
-    odds = odds[odds["market_key"] == "h2h"]
-    if odds.empty:
+
+@st.cache_data(ttl=600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
+def match_fixture_odds(fixtures_df: pd.DataFrame, odds_df: pd.DataFrame) -> pd.DataFrame:
+    """Attach fixture details to the odds rows of every market whose team keys match a fixture."""
+    if fixtures_df.empty or odds_df.empty:
         return pd.DataFrame()
-    odds["home_key"] = odds["home_team"].apply(_team_key)
-    odds["away_key"] = odds["away_team"].apply(_team_key)
 
-    fixtures_subset = fixtures[
-        [
-            "home_key",
-            "away_key",
-            "matchday",
-            "stage",
-            "kickoff_local",
-            "home_team",
-            "away_team",
-        ]
-    ].rename(
-        columns={
-            "home_team": "fixture_home_team",
-            "away_team": "fixture_away_team",
-        }
+    fixtures_subset = (
+        fixtures_df[["matchday", "stage", "kickoff_local", "home_team", "away_team"]]
+        .assign(
+            home_key=_team_key_series(fixtures_df["home_team"]),
+            away_key=_team_key_series(fixtures_df["away_team"]),
+        )
+        .rename(
+            columns={
+                "home_team": "fixture_home_team",
+                "away_team": "fixture_away_team",
+            }
+        )
     )
 
-    odds = odds.drop(columns=["home_team", "away_team"], errors="ignore")
-
-    merged = odds.merge(
-        fixtures_subset,
-        on=["home_key", "away_key"],
-        how="inner",
+    odds_cols = [
+        "event_id",
+        "market_key",
+        "outcome_name",
+        "outcome_point",
+        "price_median",
+        "bookmaker_count",
+        "last_update",
+    ]
+    odds = odds_df[odds_cols].assign(
+        home_key=_team_key_series(odds_df["home_team"]),
+        away_key=_team_key_series(odds_df["away_team"]),
     )
+
+    return _merge_on_team_keys(odds, fixtures_subset)
+
+
+@st.cache_data(ttl=600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
+def build_moneyline_summary(matched_df: pd.DataFrame) -> pd.DataFrame:
+    if matched_df.empty:
+        return pd.DataFrame()
+
+    merged = matched_df[matched_df["market_key"] == "h2h"].copy()
     if merged.empty:
         return pd.DataFrame()
 
-    def _map_outcome(row: pd.Series) -> str | None:
-        outcome_key = _team_key(row["outcome_name"])
-        if outcome_key == row["home_key"]:
-            return "Mandante"
-        if outcome_key == row["away_key"]:
-            return "Visitante"
-        outcome_norm = _normalize_team_name(row["outcome_name"])
-        if outcome_norm in {"draw", "empate"}:
-            return "Empate"
-        return None
-
-    merged["outcome_label"] = merged.apply(_map_outcome, axis=1)
+    outcome_norm = _normalize_team_series(merged["outcome_name"])
+    outcome_key = outcome_norm.map(_team_key_from_norm)
+    conditions = [
+        outcome_key.values == merged["home_key"].values,
+        outcome_key.values == merged["away_key"].values,
+        outcome_norm.isin(["draw", "empate"]).values,
+    ]
+    merged["outcome_label"] = np.select(conditions, ["Mandante", "Visitante", "Empate"], default=None)
     merged = merged[merged["outcome_label"].notna()]
     if merged.empty:
         return pd.DataFrame()
 
-    grouped = merged.groupby("outcome_label")["outcome_price"].median()
-    bookmaker_count = merged["bookmaker_key"].nunique()
-    last_update = merged["bookmaker_last_update"].max()
+    grouped = merged.groupby("outcome_label", sort=False, observed=True)["price_median"].median()
+    bookmaker_count = merged["bookmaker_count"].max()
+    last_update = merged["last_update"].max()
     last_update_display = "-"
     if pd.notna(last_update):
-        last_update_display = pd.to_datetime(last_update).strftime("%d/%m %H:%M")
-    match_info = merged.iloc[0]
+        last_update_display = last_update.strftime("%d/%m %H:%M")
+    match_info = merged[MATCH_INFO_COLUMNS].iloc[0].to_dict()
     summary = {
         "Rodada": match_info["matchday"],
         "Fase": match_info["stage"],
@@ -288,67 +461,38 @@ def build_moneyline_summary(fixtures_df: pd.DataFrame, odds_df: pd.DataFrame) ->
     return df
 
 
-def build_totals_table(fixtures_df: pd.DataFrame, odds_df: pd.DataFrame) -> pd.DataFrame:
-    if fixtures_df.empty or odds_df.empty:
-        return pd.DataFrame()
-
-    fixtures = fixtures_df.copy()
-    fixtures["home_key"] = fixtures["home_team"].apply(_team_key)
-    fixtures["away_key"] = fixtures["away_team"].apply(_team_key)
-
-    odds = odds_df.copy()
-    odds = odds[odds["market_key"] == "totals"]
-    if odds.empty:
+@st.cache_data(ttl=600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
+def build_totals_table(matched_df: pd.DataFrame) -> pd.DataFrame:
+    if matched_df.empty:
         return pd.DataFrame()
-    odds["home_key"] = odds["home_team"].apply(_team_key)
-    odds["away_key"] = odds["away_team"].apply(_team_key)
-
-    fixtures_subset = fixtures[
-        [
-            "home_key",
-            "away_key",
-            "matchday",
-            "stage",
-            "kickoff_local",
-            "home_team",
-            "away_team",
-        ]
-    ].rename(
-        columns={
-            "home_team": "fixture_home_team",
-            "away_team": "fixture_away_team",
-        }
-    )
-
-    odds = odds.drop(columns=["home_team", "away_team"], errors="ignore")
 
-    merged = odds.merge(fixtures_subset, on=["home_key", "away_key"], how="inner")
+    merged = matched_df[matched_df["market_key"] == "totals"]
     if merged.empty:
         return pd.DataFrame()
 
     records: list[dict] = []
     pivot = (
-        merged.groupby(["outcome_point", "outcome_name"])["outcome_price"]
+        merged.groupby(["outcome_point", "outcome_name"], sort=False, observed=True)["price_median"]
         .median()
         .unstack()
         .rename(columns=lambda c: c.title())
     )
     if pivot.empty:
         return pd.DataFrame()
-    counts = merged.groupby("outcome_point")["bookmaker_key"].nunique()
-    last_update = merged.groupby("outcome_point")["bookmaker_last_update"].max()
+    counts = merged.groupby("outcome_point", sort=False, observed=True)["bookmaker_count"].max()
+    last_update = merged.groupby("outcome_point", sort=False, observed=True)["last_update"].max()
     pivot = pivot.reset_index().rename(columns={"outcome_point": "Linha (gols)"})
-    match_row = merged.iloc[0]
-    pivot["Rodada"] = match_row["matchday"]
-    pivot["Fase"] = match_row["stage"]
-    pivot["Data (BR)"] = match_row["kickoff_local"]
-    pivot["Partida"] = f"{match_row['fixture_home_team']} x {match_row['fixture_away_team']}"
+    match_info = merged[MATCH_INFO_COLUMNS].iloc[0].to_dict()
+    pivot["Rodada"] = match_info["matchday"]
+    pivot["Fase"] = match_info["stage"]
+    pivot["Data (BR)"] = match_info["kickoff_local"]
+    pivot["Partida"] = f"{match_info['fixture_home_team']} x {match_info['fixture_away_team']}"
     pivot["Casas consideradas"] = pivot["Linha (gols)"].map(counts).fillna(0).astype(int)
     def _format_update(pt):
         val = last_update.get(pt)
         if pd.isna(val):
             return "-"
-        return pd.to_datetime(val).strftime("%d/%m %H:%M")
+        return val.strftime("%d/%m %H:%M")
     pivot["Atualizado (UTC)"] = pivot["Linha (gols)"].map(_format_update)
     ordered = pivot[
         [
@@ -366,88 +510,71 @@ def build_totals_table(fixtures_df: pd.DataFrame, odds_df: pd.DataFrame) -> pd.D
     return ordered.sort_values(["Linha (gols)"])
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_team_insights(team_id: int):
-    stats_sql = """
+    summary_sql = """
         SELECT
             COUNT(*) AS matches_played,
-            COALESCE(SUM(CASE WHEN home_team_id = ? THEN ft_home_goals ELSE ft_away_goals END), 0) AS goals_for,
-            COALESCE(SUM(CASE WHEN home_team_id = ? THEN ft_away_goals ELSE ft_home_goals END), 0) AS goals_against
-        FROM silver.matches
-        WHERE competition_code = 'CL'
-          AND status IN ('FINISHED','AWARDED')
-          AND (home_team_id = ? OR away_team_id = ?);
-    """
-    stats = con.execute(stats_sql, [team_id] * 4).df().iloc[0]
-
-    points_sql = """
-        SELECT
+            COALESCE(SUM(CASE WHEN home_team_id = $tid THEN ft_home_goals ELSE ft_away_goals END), 0) AS goals_for,
+            COALESCE(SUM(CASE WHEN home_team_id = $tid THEN ft_away_goals ELSE ft_home_goals END), 0) AS goals_against,
             COALESCE(SUM(
                 CASE
-                    WHEN home_team_id = ? AND ft_home_goals > ft_away_goals THEN 3
-                    WHEN away_team_id = ? AND ft_away_goals > ft_home_goals THEN 3
+                    WHEN home_team_id = $tid AND ft_home_goals > ft_away_goals THEN 3
+                    WHEN away_team_id = $tid AND ft_away_goals > ft_home_goals THEN 3
                     WHEN ft_home_goals = ft_away_goals THEN 1
                     ELSE 0
                 END
-            ), 0) AS points_total
-        FROM silver.matches
-        WHERE competition_code = 'CL'
-          AND status IN ('FINISHED','AWARDED')
-          AND (home_team_id = ? OR away_team_id = ?);
-    """
-    points_row = con.execute(points_sql, [team_id] * 4).df().iloc[0]
-
-    location_sql = """
-        SELECT
-            SUM(CASE WHEN home_team_id = ? THEN ft_home_goals ELSE 0 END) AS gf_home,
-            SUM(CASE WHEN home_team_id = ? THEN ft_away_goals ELSE 0 END) AS ga_home,
-            COUNT(CASE WHEN home_team_id = ? THEN 1 END) AS games_home,
-            SUM(CASE WHEN away_team_id = ? THEN ft_away_goals ELSE 0 END) AS gf_away,
-            SUM(CASE WHEN away_team_id = ? THEN ft_home_goals ELSE 0 END) AS ga_away,
-            COUNT(CASE WHEN away_team_id = ? THEN 1 END) AS games_away,
-            COUNT(CASE WHEN home_team_id = ? AND ft_away_goals = 0 THEN 1 END) AS clean_home,
-            COUNT(CASE WHEN away_team_id = ? AND ft_home_goals = 0 THEN 1 END) AS clean_away
+            ), 0) AS points_total,
+            SUM(CASE WHEN home_team_id = $tid THEN ft_home_goals ELSE 0 END) AS gf_home,
+            SUM(CASE WHEN home_team_id = $tid THEN ft_away_goals ELSE 0 END) AS ga_home,
+            COUNT(CASE WHEN home_team_id = $tid THEN 1 END) AS games_home,
+            SUM(CASE WHEN away_team_id = $tid THEN ft_away_goals ELSE 0 END) AS gf_away,
+            SUM(CASE WHEN away_team_id = $tid THEN ft_home_goals ELSE 0 END) AS ga_away,
+            COUNT(CASE WHEN away_team_id = $tid THEN 1 END) AS games_away,
+            COUNT(CASE WHEN home_team_id = $tid AND ft_away_goals = 0 THEN 1 END) AS clean_home,
+            COUNT(CASE WHEN away_team_id = $tid AND ft_home_goals = 0 THEN 1 END) AS clean_away
         FROM silver.matches
         WHERE competition_code = 'CL'
           AND status IN ('FINISHED','AWARDED')
-          AND (home_team_id = ? OR away_team_id = ?);
+          AND (home_team_id = $tid OR away_team_id = $tid);
     """
-    location_row = con.execute(location_sql, [team_id] * 10).df().iloc[0]
+    summary_row = con.execute(summary_sql, {"tid": team_id}).df().iloc[0]
+    stats = summary_row[["matches_played", "goals_for", "goals_against"]]
     def _avg(numer: float, denom: float) -> float | None:
         return float(numer) / float(denom) if denom and denom > 0 else None
     location_avgs = {
-        "gf_home_avg": _avg(location_row["gf_home"], location_row["games_home"]),
-        "ga_home_avg": _avg(location_row["ga_home"], location_row["games_home"]),
-        "gf_away_avg": _avg(location_row["gf_away"], location_row["games_away"]),
-        "ga_away_avg": _avg(location_row["ga_away"], location_row["games_away"]),
-        "games_home": int(location_row["games_home"]),
-        "games_away": int(location_row["games_away"]),
-        "clean_home": int(location_row["clean_home"]),
-        "clean_away": int(location_row["clean_away"]),
-        "clean_total": int(location_row["clean_home"] + location_row["clean_away"]),
+        "gf_home_avg": _avg(summary_row["gf_home"], summary_row["games_home"]),
+        "ga_home_avg": _avg(summary_row["ga_home"], summary_row["games_home"]),
+        "gf_away_avg": _avg(summary_row["gf_away"], summary_row["games_away"]),
+        "ga_away_avg": _avg(summary_row["ga_away"], summary_row["games_away"]),
+        "games_home": int(summary_row["games_home"]),
+        "games_away": int(summary_row["games_away"]),
+        "clean_home": int(summary_row["clean_home"]),
+        "clean_away": int(summary_row["clean_away"]),
+        "clean_total": int(summary_row["clean_home"] + summary_row["clean_away"]),
     }
 
     form_sql = """
         WITH ordered AS (
             SELECT
-                match_id,
                 match_utc_datetime,
                 CASE
                     WHEN ft_home_goals = ft_away_goals THEN 'E'
-                    WHEN home_team_id = ? AND ft_home_goals > ft_away_goals THEN 'V'
-                    WHEN away_team_id = ? AND ft_away_goals > ft_home_goals THEN 'V'
+                    WHEN home_team_id = $tid AND ft_home_goals > ft_away_goals THEN 'V'
+                    WHEN away_team_id = $tid AND ft_away_goals > ft_home_goals THEN 'V'
                     ELSE 'D'
                 END AS result
             FROM silver.matches
             WHERE competition_code = 'CL'
               AND status IN ('FINISHED','AWARDED')
-              AND (home_team_id = ? OR away_team_id = ?)
+              AND (home_team_id = $tid OR away_team_id = $tid)
             ORDER BY match_utc_datetime DESC
             LIMIT 3
         )
         SELECT string_agg(result, ' - ' ORDER BY match_utc_datetime DESC) AS form
         FROM ordered;
     """
-    form_df = con.execute(form_sql, [team_id] * 4).df()
+    form_df = con.execute(form_sql, {"tid": team_id}).df()
     form_display = form_df.iloc[0]["form"] if not form_df.empty else None
 
     matches_sql = """
@@ -459,8 +586,8 @@ def fetch_team_insights(team_id: int):
             sm.ft_away_goals,
             CASE
                 WHEN sm.ft_home_goals = sm.ft_away_goals THEN 'Empate'
-                WHEN sm.home_team_id = ? AND sm.ft_home_goals > sm.ft_away_goals THEN 'Vitória'
-                WHEN sm.away_team_id = ? AND sm.ft_away_goals > sm.ft_home_goals THEN 'Vitória'
+                WHEN sm.home_team_id = $tid AND sm.ft_home_goals > sm.ft_away_goals THEN 'Vitória'
+                WHEN sm.away_team_id = $tid AND sm.ft_away_goals > sm.ft_home_goals THEN 'Vitória'
                 ELSE 'Derrota'
             END AS resultado,
             adversary_stats.points_before AS pontos_adversario_pre_jogo
@@ -471,28 +598,28 @@ def fetch_team_insights(team_id: int):
             WHERE competition_code = 'CL'
         ) adversary_stats
           ON adversary_stats.match_id = sm.match_id
-          AND adversary_stats.team_id = CASE WHEN sm.home_team_id = ? THEN sm.away_team_id ELSE sm.home_team_id END
+          AND adversary_stats.team_id = CASE WHEN sm.home_team_id = $tid THEN sm.away_team_id ELSE sm.home_team_id END
         WHERE sm.competition_code = 'CL'
           AND sm.status IN ('FINISHED','AWARDED')
-          AND (sm.home_team_id = ? OR sm.away_team_id = ?)
+          AND (sm.home_team_id = $tid OR sm.away_team_id = $tid)
         ORDER BY sm.match_utc_datetime DESC;
     """
-    matches_df = con.execute(matches_sql, [team_id] * 5).df()
+    matches_df = con.execute(matches_sql, {"tid": team_id}).df()
 
     goals_chart_sql = """
         SELECT
             matchday,
-            CASE WHEN home_team_id = ? THEN 'Mandante' ELSE 'Visitante' END AS location,
-            SUM(CASE WHEN home_team_id = ? THEN ft_home_goals ELSE ft_away_goals END) AS goals_for,
-            SUM(CASE WHEN home_team_id = ? THEN ft_away_goals ELSE ft_home_goals END) AS goals_against
+            CASE WHEN home_team_id = $tid THEN 'Mandante' ELSE 'Visitante' END AS location,
+            SUM(CASE WHEN home_team_id = $tid THEN ft_home_goals ELSE ft_away_goals END) AS goals_for,
+            SUM(CASE WHEN home_team_id = $tid THEN ft_away_goals ELSE ft_home_goals END) AS goals_against
         FROM silver.matches
         WHERE competition_code = 'CL'
           AND status IN ('FINISHED','AWARDED')
-          AND (home_team_id = ? OR away_team_id = ?)
+          AND (home_team_id = $tid OR away_team_id = $tid)
         GROUP BY matchday, location
         ORDER BY matchday;
     """
-    goals_df = con.execute(goals_chart_sql, [team_id] * 5).df()
+    goals_df = con.execute(goals_chart_sql, {"tid": team_id}).df()
 
     last_games_sql = """
         SELECT
@@ -504,17 +631,18 @@ def fetch_team_insights(team_id: int):
             ft_away_goals,
             CASE
                 WHEN ft_home_goals = ft_away_goals THEN 'Empate'
-                WHEN home_team_id = ? AND ft_home_goals > ft_away_goals THEN 'Vitória'
-                WHEN away_team_id = ? AND ft_away_goals > ft_home_goals THEN 'Vitória'
+                WHEN home_team_id = $tid AND ft_home_goals > ft_away_goals THEN 'Vitória'
+                WHEN away_team_id = $tid AND ft_away_goals > ft_home_goals THEN 'Vitória'
                 ELSE 'Derrota'
             END AS resultado
         FROM silver.matches
         WHERE status IN ('FINISHED','AWARDED')
-          AND (home_team_id = ? OR away_team_id = ?)
+          AND match_utc_datetime >= now() - INTERVAL 2 YEAR
+          AND (home_team_id = $tid OR away_team_id = $tid)
         ORDER BY match_utc_datetime DESC
         LIMIT 5;
     """
-    last_games_df = con.execute(last_games_sql, [team_id] * 4).df()
+    last_games_df = con.execute(last_games_sql, {"tid": team_id}).df()
 
     return {
         "stats": stats,
@@ -523,10 +651,32 @@ def fetch_team_insights(team_id: int):
         "goals": goals_df,
         "last_games": last_games_df,
         "location_avgs": location_avgs,
-        "points_total": int(points_row["points_total"]),
+        "points_total": int(summary_row["points_total"]),
     }
 
 
+_COLOR_MAPS = {
+    None: {
+        "Gols pró (Mandante)": "#2ca02c",
+        "Gols contra (Mandante)": "#d62728",
+        "Gols pró (Visitante)": "#9ecf9e",
+        "Gols contra (Visitante)": "#e6b0b0",
+    },
+    "Mandante": {
+        "Gols pró (Mandante)": "#2ca02c",
+        "Gols contra (Mandante)": "#d62728",
+        "Gols pró (Visitante)": "#9ecf9e",
+        "Gols contra (Visitante)": "#e6b0b0",
+    },
+    "Visitante": {
+        "Gols pró (Visitante)": "#2ca02c",
+        "Gols contra (Visitante)": "#d62728",
+        "Gols pró (Mandante)": "#9ecf9e",
+        "Gols contra (Mandante)": "#e6b0b0",
+    },
+}
+
+
 def render_team_insights(team_name: str, team_id: int, current_role: str | None = None):
     insights = fetch_team_insights(team_id)
     stats = insights["stats"]
@@ -584,11 +734,14 @@ def render_team_insights(team_name: str, team_id: int, current_role: str | None
         col_cs3.metric("Clean sheets (visitante)", cs_away)
 
     st.markdown("#### Jogos na Champions")
-    matches_df = insights["matches"].copy()
+    matches_df = insights["matches"]
     if not matches_df.empty:
-        matches_df["Data/Hora"] = pd.to_datetime(matches_df["match_utc_datetime"]).dt.strftime("%d/%m %H:%M")
-        matches_df["Separador"] = "x"
-        matches_display = matches_df.rename(
+        matches_display = matches_df.assign(
+            **{
+                "Data/Hora": matches_df["match_utc_datetime"].dt.strftime("%d/%m %H:%M"),
+                "Separador": "x",
+            }
+        ).rename(
             columns={
                 "home_team_name": "Mandante",
                 "ft_home_goals": "Gols Mandante",
@@ -613,40 +766,20 @@ def render_team_insights(team_name: str, team_id: int, current_role: str | None
 
     goals_df = insights["goals"]
     if not goals_df.empty:
-        goals_df = goals_df.copy()
-        goals_df["matchday"] = goals_df["matchday"].fillna("N/A")
-        goals_df["location"] = goals_df["location"].fillna("Indefinido")
-        goals_long = goals_df.melt(
-            id_vars=["matchday", "location"],
-            value_vars=["goals_for", "goals_against"],
-            var_name="metric",
-            value_name="gols",
-        )
         metric_labels = {"goals_for": "Gols pró", "goals_against": "Gols contra"}
-        goals_long["metric"] = goals_long["metric"].map(metric_labels)
-        goals_long["metric_loc"] = goals_long["metric"] + " (" + goals_long["location"] + ")"
-
-        def _color_map(role: str | None):
-            base = {
-                ("Gols pró", "Mandante"): "#2ca02c",
-                ("Gols contra", "Mandante"): "#d62728",
-                ("Gols pró", "Visitante"): "#9ecf9e",
-                ("Gols contra", "Visitante"): "#e6b0b0",
-            }
-            if role is None:
-                return {f"{m} ({loc})": color for (m, loc), color in base.items()}
-            bright = {
-                ("Gols pró", role): "#2ca02c",
-                ("Gols contra", role): "#d62728",
-            }
-            muted = {
-                ("Gols pró", "Mandante" if role == "Visitante" else "Visitante"): "#9ecf9e",
-                ("Gols contra", "Mandante" if role == "Visitante" else "Visitante"): "#e6b0b0",
-            }
-            colors = bright | muted
-            return {f"{m} ({loc})": color for (m, loc), color in colors.items()}
+        goals_long = (
+            goals_df.fillna({"matchday": "N/A", "location": "Indefinido"})
+            .melt(
+                id_vars=["matchday", "location"],
+                value_vars=["goals_for", "goals_against"],
+                var_name="metric",
+                value_name="gols",
+            )
+            .assign(metric=lambda df: df["metric"].map(metric_labels))
+            .assign(metric_loc=lambda df: df["metric"] + " (" + df["location"] + ")")
+        )
 
-        color_map = _color_map(current_role)
+        color_map = _COLOR_MAPS.get(current_role, _COLOR_MAPS[None])
         fig = px.bar(
             goals_long,
             x="matchday",
@@ -677,11 +810,14 @@ def render_team_insights(team_name: str, team_id: int, current_role: str | None
         st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("#### Últimos 5 jogos (todas as competições)")
-    last_games_df = insights["last_games"].copy()
+    last_games_df = insights["last_games"]
     if not last_games_df.empty:
-        last_games_df["Data/Hora"] = pd.to_datetime(last_games_df["match_utc_datetime"]).dt.strftime("%d/%m %H:%M")
-        last_games_df["Separador"] = "x"
-        last_display = last_games_df.rename(
+        last_display = last_games_df.assign(
+            **{
+                "Data/Hora": last_games_df["match_utc_datetime"].dt.strftime("%d/%m %H:%M"),
+                "Separador": "x",
+            }
+        ).rename(
             columns={
                 "home_team_name": "Mandante",
                 "ft_home_goals": "Gols Mandante",
@@ -716,8 +852,15 @@ if upcoming_df.empty:
 else:
     st.dataframe(upcoming_df[["matchday", "kickoff_local", "home_team", "away_team", "stage"]], use_container_width=True, hide_index=True)
     fixture_options = [
-        (idx, f"{row.home_team} x {row.away_team} ({row.kickoff_local}) - Rodada {row.matchday}")
-        for idx, row in upcoming_df.iterrows()
+        (idx, f"{home} x {away} ({kickoff}) - Rodada {matchday}")
+        for idx, (home, away, kickoff, matchday) in enumerate(
+            zip(
+                upcoming_df["home_team"],
+                upcoming_df["away_team"],
+                upcoming_df["kickoff_local"],
+                upcoming_df["matchday"],
+            )
+        )
     ]
     selected_option = st.selectbox(
         "Selecione uma partida para comparar estatísticas",
@@ -737,24 +880,27 @@ else:
         st.info("A partida selecionada ainda não possui times definidos.")
 
     st.markdown("#### Odds das casas europeias (Odds API)")
+    odds_cache_key = (ODDS_REGIONS, ODDS_MARKETS)
     try:
         odds_raw_df, odds_meta, used_markets = get_cl_odds_data()
-        st.session_state["odds_cache"] = {
-            "df": odds_raw_df,
-            "meta": odds_meta,
-            "markets": used_markets,
-            "captured_at": pd.Timestamp.utcnow(),
-        }
+        captured_at = pd.Timestamp.now(tz="UTC")
+        _odds_cache_put(
+            odds_cache_key,
+            {
+                "df": odds_raw_df,
+                "meta": odds_meta,
+                "markets": used_markets,
+                "captured_at": captured_at,
+                "expires_at": captured_at + ODDS_CACHE_MAX_AGE,
+            },
+        )
     except OddsAPIError as exc:
-        cache = st.session_state.get("odds_cache")
-        if cache and isinstance(cache, dict) and "df" in cache:
-            odds_raw_df = cache.get("df", pd.DataFrame())
-            odds_meta = cache.get("meta", OddsAPIMeta())
-            used_markets = cache.get("markets", tuple())
-            cached_at = cache.get("captured_at")
-            cached_at_display = "-"
-            if pd.notna(cached_at):
-                cached_at_display = pd.to_datetime(cached_at).strftime("%d/%m %H:%M")
+        cache = _odds_cache_get(odds_cache_key)
+        if cache:
+            odds_raw_df = cache["df"]
+            odds_meta = cache["meta"]
+            used_markets = cache["markets"]
+            cached_at_display = cache["captured_at"].strftime("%d/%m %H:%M")
             st.warning(
                 f"Nao foi possivel consultar a Odds API: {exc}. "
                 f"Usando o ultimo cache valido ({cached_at_display} UTC)."
@@ -764,7 +910,8 @@ else:
             odds_raw_df = pd.DataFrame()
             odds_meta = OddsAPIMeta()
             used_markets = tuple()
-    odds_overview = _build_odds_overview(odds_raw_df)
+    odds_df = _odds_columns(odds_raw_df)
+    odds_overview = _build_odds_overview(odds_df)
     if DEBUG_ODDS:
         st.caption(f"Odds rows: {len(odds_raw_df)} | eventos: {len(odds_overview)} | markets: {used_markets}")
         if not odds_overview.empty:
@@ -773,13 +920,14 @@ else:
                 use_container_width=True,
                 hide_index=True,
             )
-    odds_table = build_moneyline_summary(selected_fixture_df, odds_raw_df)
+    fixture_home_key = _team_key(match_row["home_team"])
+    fixture_away_key = _team_key(match_row["away_team"])
+    fixture_odds_df = _filter_fixture_odds(odds_df, odds_overview, fixture_home_key, fixture_away_key)
+    matched_odds_df = match_fixture_odds(selected_fixture_df, fixture_odds_df)
+    odds_table = build_moneyline_summary(matched_odds_df)
     if DEBUG_ODDS and not odds_overview.empty:
-        fixture_row = selected_fixture_df.iloc[0]
-        fixture_home = _normalize_team_name(fixture_row["home_team"])
-        fixture_away = _normalize_team_name(fixture_row["away_team"])
-        fixture_home_key = _team_key(fixture_row["home_team"])
-        fixture_away_key = _team_key(fixture_row["away_team"])
+        fixture_home = _normalize_team_name(match_row["home_team"])
+        fixture_away = _normalize_team_name(match_row["away_team"])
         exact = odds_overview[
             (odds_overview["home_key"] == fixture_home_key) & (odds_overview["away_key"] == fixture_away_key)
         ]
@@ -820,7 +968,7 @@ else:
     if not totals_enabled:
         st.info("O mercado 'totals' não está disponível para este esporte/período na Odds API.")
     else:
-        totals_table = build_totals_table(selected_fixture_df, odds_raw_df)
+        totals_table = build_totals_table(matched_odds_df)
         if totals_table.empty:
             st.info("Este confronto ainda não possui linhas de totais disponíveis nas casas europeias.")
         else:
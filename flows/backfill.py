@@ -2,12 +2,12 @@ from __future__ import annotations
 
 from datetime import datetime
 
-import pandas as pd
 from prefect import flow, task
 
-from footballdata.extract.football_data_api import fetch_matches_since
+from footballdata.extract.football_data_api import iter_matches_since
 from footballdata.io.duckdb_client import DuckDB, init_schemas
 from footballdata.transform.normalize import ensure_dtypes_matches
+from footballdata.utils.idempotency import invalidate_watermark_cache
 from footballdata.utils.logging import get_logger
 
 
@@ -15,30 +15,56 @@ logger = get_logger(__name__)
 SEASON_2025_START = datetime(2025, 9, 1)
 
 
-@task(retries=3, retry_delay_seconds=30, name="extract_matches_backfill")
-def extract_matches_backfill_task(since: datetime, until: datetime | None = None):
-    return fetch_matches_since(since, until=until)
+def _raw_matches_exists(client: DuckDB) -> bool:
+    return bool(
+        client.con.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_schema = 'raw' AND table_name = 'matches'"
+        ).fetchone()
+    )
 
 
-@task(name="load_raw_backfill")
-def load_raw_backfill_task(df: pd.DataFrame):
-    if df is None:
-        return 0, 0
-    df = ensure_dtypes_matches(df)
-    return DuckDB().upsert_df("raw.matches", df, key_cols=["id"])  # type: ignore[arg-type]
+def _bootstrap_raw_matches(client: DuckDB, since: datetime, until: datetime | None) -> tuple[int, int]:
+    """Cold start: every row is new, so append each window straight from Arrow instead of upserting."""
+    created, inserted = False, 0
+    for chunk in iter_matches_since(since, until=until):
+        tbl = ensure_dtypes_matches(chunk)
+        client.con.register("bootstrap_chunk", tbl)
+        try:
+            if not created:
+                client.exec_sql("CREATE TABLE raw.matches AS SELECT * FROM bootstrap_chunk;")
+            else:
+                client.exec_sql("INSERT INTO raw.matches BY NAME SELECT * FROM bootstrap_chunk;")
+        finally:
+            client.con.unregister("bootstrap_chunk")
+        created = True
+        inserted += tbl.num_rows
+    if inserted:
+        logger.info("raw.matches criada a partir do Arrow com %s linhas.", inserted)
+    return inserted, 0
+
+
+@task(retries=3, retry_delay_seconds=30, name="extract_load_backfill")
+def extract_load_backfill_task(since: datetime, until: datetime | None = None):
+    client = DuckDB()
+    if not _raw_matches_exists(client):
+        return _bootstrap_raw_matches(client, since, until)
+
+    # Each window is upserted as soon as it arrives; generators can't be passed between tasks.
+    inserted = updated = 0
+    for chunk in iter_matches_since(since, until=until):
+        chunk_inserted, chunk_updated = client.upsert_df("raw.matches", ensure_dtypes_matches(chunk), key_cols=["id"])
+        inserted += chunk_inserted
+        updated += chunk_updated
+    return inserted, updated
 
 
 @task(name="transform_sql_backfill")
 def transform_sql_backfill_task():
     con = DuckDB()
-    exists = con.con.execute(
-        "SELECT 1 FROM information_schema.tables WHERE table_schema = 'raw' AND table_name = 'matches'"
-    ).fetchone()
-    if not exists:
+    if not _raw_matches_exists(con):
         logger.info("Tabela raw.matches não existe ainda; pulando transformações SQL.")
         return
-    con.exec_sql_file("sql/silver/matches.sql")
-    con.exec_sql_file("sql/gold/team_form.sql")
+    con.exec_sql_files(["sql/silver/matches.sql", "sql/gold/team_form.sql"])
 
 
 @flow(name="backfill")
@@ -47,9 +73,9 @@ def backfill(
     end: datetime | None = None,
 ):
     init_schemas()
+    invalidate_watermark_cache()
     start = start or SEASON_2025_START
-    df = extract_matches_backfill_task(start, end)
-    load_raw_backfill_task(df)
+    extract_load_backfill_task(start, end)
     transform_sql_backfill_task()
 
 
@@ -1,16 +1,15 @@
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import datetime, timezone
 from pathlib import Path
 
-import pandas as pd
 from prefect import flow, task
 
 from footballdata.config import settings
-from footballdata.extract.football_data_api import fetch_matches_since
+from footballdata.extract.football_data_api import iter_matches_since
 from footballdata.io.duckdb_client import DuckDB, init_schemas
 from footballdata.transform.normalize import ensure_dtypes_matches
-from footballdata.utils.idempotency import get_high_watermark, set_high_watermark, set_last_success_at
+from footballdata.utils.idempotency import get_high_watermark, invalidate_watermark_cache, set_watermarks_bulk
 from footballdata.utils.dates import utc_now
 from footballdata.utils.logging import get_logger
 
@@ -22,18 +21,29 @@ ENTITY = "matches"
 ENTITY_KEY = "competition=ALL;season=ALL"
 
 
-@task(retries=3, retry_delay_seconds=30, name="extract_matches")
-def extract_matches_task(since):
-    df = fetch_matches_since(since)
-    return df
+def _entity_key(competition: str | None) -> str:
+    if competition is None:
+        return ENTITY_KEY
+    return f"competition={competition};season=ALL"
 
 
-@task(name="load_raw_matches")
-def load_raw_task(df: pd.DataFrame):
-    if df is None:
-        return 0, 0
-    df = ensure_dtypes_matches(df)
-    return DuckDB().upsert_df("raw.matches", df, key_cols=["id"])  # type: ignore[arg-type]
+def _resolve_since(watermark: datetime) -> datetime:
+    # Watermarks are stored as naive UTC timestamps; the stored value is the resume point.
+    if watermark.tzinfo is None:
+        watermark = watermark.replace(tzinfo=timezone.utc)
+    return watermark
+
+
+@task(retries=3, retry_delay_seconds=30, name="extract_load_matches")
+def extract_load_task(since, competitions: list[str] | None = None):
+    # Each window is upserted as soon as it arrives, so the run never holds the full result set.
+    client = DuckDB()
+    inserted = updated = 0
+    for chunk in iter_matches_since(since, competitions=competitions):
+        chunk_inserted, chunk_updated = client.upsert_df("raw.matches", ensure_dtypes_matches(chunk), key_cols=["id"])
+        inserted += chunk_inserted
+        updated += chunk_updated
+    return inserted, updated
 
 
 @task(name="transform_sql")
@@ -45,20 +55,26 @@ def transform_sql_task():
     if not exists:
         logger.info("Tabela raw.matches não existe ainda; pulando transformações SQL.")
         return
-    con.exec_sql_file("sql/silver/matches.sql")
-    con.exec_sql_file("sql/gold/team_form.sql")
+    con.exec_sql_files(["sql/silver/matches.sql", "sql/gold/team_form.sql"])
 
 
 @flow(name="daily_etl")
-def daily_etl():
+def daily_etl(competitions: list[str] | None = None):
+    """Incremental load; pass ``competitions`` to track a watermark per competition."""
     init_schemas()
-    since = get_high_watermark(SOURCE, ENTITY, ENTITY_KEY)
-    df = extract_matches_task(since)
-    load_raw_task(df)
+    # Long-lived workers keep the read cache across runs; start from what is stored now.
+    invalidate_watermark_cache()
+    scopes: list[str | None] = list(competitions) if competitions else [None]
+    started_at = utc_now()
+    for competition in scopes:
+        watermark = get_high_watermark(SOURCE, ENTITY, _entity_key(competition))
+        since = _resolve_since(watermark)
+        extract_load_task(since, [competition] if competition else None)
     transform_sql_task()
-    now = utc_now()
-    set_last_success_at(SOURCE, ENTITY, ENTITY_KEY, now)
-    set_high_watermark(SOURCE, ENTITY, ENTITY_KEY, now)
+    # Advance to the run start, not its end, so nothing updated mid-run falls behind the watermark.
+    set_watermarks_bulk(
+        [(SOURCE, ENTITY, _entity_key(competition), utc_now(), started_at) for competition in scopes]
+    )
 
 
 if __name__ == "__main__":
@@ -4,16 +4,23 @@ import os
 import sys
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import urllib.parse
-import urllib.request
-import urllib.error
+import pandas as pd
+import requests
+
+from footballdata.extract.flatten import extract_columns
 
 
 BASE_URL = "https://api.football-data.org/v4"
 COMPETITION_CODE = "CL"
 
+# Flattened output: one list per CSV column, all of the same length.
+Columns = Dict[str, List[Any]]
+
+# One session for every call in main() so the TLS connection is kept alive.
+SESSION = requests.Session()
+
 
 def get_token() -> Optional[str]:
     """Return API token from env var FOOTBALL_DATA_API_TOKEN, or None."""
@@ -26,9 +33,6 @@ def get_token() -> Optional[str]:
 def http_get(path: str, params: Optional[Dict[str, Any]] = None, token: Optional[str] = None) -> Dict[str, Any]:
     """Perform a GET request with retries and return parsed JSON."""
     url = f"{BASE_URL.rstrip('/')}/{path.lstrip('/')}"
-    if params:
-        qs = urllib.parse.urlencode(params, doseq=True)
-        url = f"{url}?{qs}"
 
     headers = {
         "Accept": "application/json",
@@ -36,39 +40,40 @@ def http_get(path: str, params: Optional[Dict[str, Any]] = None, token: Optional
     if token:
         headers["X-Auth-Token"] = token
 
-    req = urllib.request.Request(url, headers=headers, method="GET")
-
     # Basic retry for rate-limits and transient errors
     attempts = 0
     while True:
         attempts += 1
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                data = resp.read()
-                return json.loads(data.decode("utf-8"))
-        except urllib.error.HTTPError as e:
-            status = e.code
-            body = e.read().decode("utf-8", errors="replace")
-            if status in (429, 503) and attempts < 5:
-                # Retry with exponential backoff
-                time.sleep(min(2 ** attempts, 16))
-                continue
-            # Re-raise with more context
-            raise RuntimeError(f"HTTP {status} for {url}: {body}") from e
-        except urllib.error.URLError as e:
+            resp = SESSION.get(url, params=params, headers=headers, timeout=30)
+        except requests.RequestException as e:
             if attempts < 5:
                 time.sleep(min(2 ** attempts, 16))
                 continue
             raise RuntimeError(f"Network error for {url}: {e}") from e
 
+        status = resp.status_code
+        if status >= 400:
+            if status in (429, 503) and attempts < 5:
+                # Retry with exponential backoff
+                time.sleep(min(2 ** attempts, 16))
+                continue
+            # Raise with more context
+            raise RuntimeError(f"HTTP {status} for {resp.url}: {resp.text}")
+        return resp.json()
+
 
 def ensure_output_dir(path: str = "output") -> str:
     os.makedirs(path, exist_ok=True)
     return path
 
 
-def write_csv(path: str, rows: List[Dict[str, Any]], field_order: Optional[List[str]] = None) -> None:
-    if not rows:
+def row_count(columns: Columns) -> int:
+    return len(next(iter(columns.values()), []))
+
+
+def write_csv(path: str, columns: Columns, field_order: Optional[List[str]] = None) -> None:
+    if not row_count(columns):
         # create empty file with header if provided
         with open(path, "w", newline="", encoding="utf-8") as f:
             if field_order:
@@ -79,118 +84,105 @@ def write_csv(path: str, rows: List[Dict[str, Any]], field_order: Optional[List[
         return
 
     if field_order is None:
-        # preserve a stable order: keys from first row
-        field_order = list(rows[0].keys())
-
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=field_order)
-        writer.writeheader()
-        for r in rows:
-            writer.writerow({k: r.get(k, "") for k in field_order})
-
-
-def flatten_standings(data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for table in data.get("standings", []):
-        stage = table.get("stage")
-        group = table.get("group")
-        ttype = table.get("type")
-        for position in table.get("table", []) or []:
-            team = position.get("team", {})
-            rows.append({
-                "stage": stage,
-                "group": group,
-                "type": ttype,
-                "position": position.get("position"),
-                "team_id": team.get("id"),
-                "team_name": team.get("name"),
-                "playedGames": position.get("playedGames"),
-                "won": position.get("won"),
-                "draw": position.get("draw"),
-                "lost": position.get("lost"),
-                "goalsFor": position.get("goalsFor"),
-                "goalsAgainst": position.get("goalsAgainst"),
-                "goalDifference": position.get("goalDifference"),
-                "points": position.get("points"),
-            })
-    return rows
-
-
-def flatten_teams(data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for t in data.get("teams", []) or []:
-        area = t.get("area", {})
-        rows.append({
-            "id": t.get("id"),
-            "name": t.get("name"),
-            "shortName": t.get("shortName"),
-            "tla": t.get("tla"),
-            "area_id": area.get("id"),
-            "area_name": area.get("name"),
-            "founded": t.get("founded"),
-            "clubColors": t.get("clubColors"),
-            "venue": t.get("venue"),
-            "website": t.get("website"),
-        })
-    return rows
-
-
-def flatten_matches(data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for m in data.get("matches", []) or []:
-        comp = m.get("competition", {})
-        season = m.get("season", {})
-        score = m.get("score", {})
-        full = score.get("fullTime", {})
-        half = score.get("halfTime", {})
-        extra = score.get("extraTime", {})
-        pens = score.get("penalties", {})
-        home = m.get("homeTeam", {})
-        away = m.get("awayTeam", {})
-        rows.append({
-            "id": m.get("id"),
-            "utcDate": m.get("utcDate"),
-            "status": m.get("status"),
-            "matchday": m.get("matchday"),
-            "stage": m.get("stage"),
-            "group": m.get("group"),
-            "competition": comp.get("name"),
-            "season_startDate": season.get("startDate"),
-            "season_endDate": season.get("endDate"),
-            "homeTeam_id": home.get("id"),
-            "homeTeam_name": home.get("name"),
-            "awayTeam_id": away.get("id"),
-            "awayTeam_name": away.get("name"),
-            "score_winner": score.get("winner"),
-            "score_duration": score.get("duration"),
-            "ft_home": full.get("home"),
-            "ft_away": full.get("away"),
-            "ht_home": half.get("home"),
-            "ht_away": half.get("away"),
-            "et_home": extra.get("home"),
-            "et_away": extra.get("away"),
-            "p_home": pens.get("home"),
-            "p_away": pens.get("away"),
-        })
-    return rows
-
-
-def flatten_scorers(data: Dict[str, Any]) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    for s in data.get("scorers", []) or []:
-        player = s.get("player", {})
-        team = s.get("team", {})
-        rows.append({
-            "player_id": player.get("id"),
-            "player_name": player.get("name"),
-            "nationality": player.get("nationality"),
-            "team_id": team.get("id"),
-            "team_name": team.get("name"),
-            "goals": s.get("goals"),
-            "assists": s.get("assists"),
-            "penalties": s.get("penalties"),
-        })
-    return rows
+        # preserve a stable order: the flattener's column order
+        field_order = list(columns.keys())
+
+    # object dtype keeps nullable ints as "3" rather than "3.0"; CRLF matches csv.DictWriter output
+    frame = pd.DataFrame(columns, dtype=object).reindex(columns=field_order)
+    frame.to_csv(path, index=False, encoding="utf-8", lineterminator="\r\n")
+
+
+STANDING_TABLE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "stage": ("stage",),
+    "group": ("group",),
+    "type": ("type",),
+}
+
+STANDING_POSITION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "position": ("position",),
+    "team_id": ("team", "id"),
+    "team_name": ("team", "name"),
+    "playedGames": ("playedGames",),
+    "won": ("won",),
+    "draw": ("draw",),
+    "lost": ("lost",),
+    "goalsFor": ("goalsFor",),
+    "goalsAgainst": ("goalsAgainst",),
+    "goalDifference": ("goalDifference",),
+    "points": ("points",),
+}
+
+TEAM_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "id": ("id",),
+    "name": ("name",),
+    "shortName": ("shortName",),
+    "tla": ("tla",),
+    "area_id": ("area", "id"),
+    "area_name": ("area", "name"),
+    "founded": ("founded",),
+    "clubColors": ("clubColors",),
+    "venue": ("venue",),
+    "website": ("website",),
+}
+
+MATCH_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "id": ("id",),
+    "utcDate": ("utcDate",),
+    "status": ("status",),
+    "matchday": ("matchday",),
+    "stage": ("stage",),
+    "group": ("group",),
+    "competition": ("competition", "name"),
+    "season_startDate": ("season", "startDate"),
+    "season_endDate": ("season", "endDate"),
+    "homeTeam_id": ("homeTeam", "id"),
+    "homeTeam_name": ("homeTeam", "name"),
+    "awayTeam_id": ("awayTeam", "id"),
+    "awayTeam_name": ("awayTeam", "name"),
+    "score_winner": ("score", "winner"),
+    "score_duration": ("score", "duration"),
+    "ft_home": ("score", "fullTime", "home"),
+    "ft_away": ("score", "fullTime", "away"),
+    "ht_home": ("score", "halfTime", "home"),
+    "ht_away": ("score", "halfTime", "away"),
+    "et_home": ("score", "extraTime", "home"),
+    "et_away": ("score", "extraTime", "away"),
+    "p_home": ("score", "penalties", "home"),
+    "p_away": ("score", "penalties", "away"),
+}
+
+SCORER_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "player_id": ("player", "id"),
+    "player_name": ("player", "name"),
+    "nationality": ("player", "nationality"),
+    "team_id": ("team", "id"),
+    "team_name": ("team", "name"),
+    "goals": ("goals",),
+    "assists": ("assists",),
+    "penalties": ("penalties",),
+}
+
+
+def flatten_standings(data: Dict[str, Any]) -> Columns:
+    tables = data.get("standings", []) or []
+    # One entry per table position, paired with the table it belongs to.
+    owners = [table for table in tables for _ in table.get("table", []) or []]
+    positions = [position for table in tables for position in table.get("table", []) or []]
+    columns = extract_columns(owners, STANDING_TABLE_FIELDS)
+    columns.update(extract_columns(positions, STANDING_POSITION_FIELDS))
+    return columns
+
+
+def flatten_teams(data: Dict[str, Any]) -> Columns:
+    return extract_columns(data.get("teams", []) or [], TEAM_FIELDS)
+
+
+def flatten_matches(data: Dict[str, Any]) -> Columns:
+    return extract_columns(data.get("matches", []) or [], MATCH_FIELDS)
+
+
+def flatten_scorers(data: Dict[str, Any]) -> Columns:
+    return extract_columns(data.get("scorers", []) or [], SCORER_FIELDS)
 
 
 def main() -> int:
@@ -225,7 +217,7 @@ def main() -> int:
                 f"Detalhes: {e}\n"
             )
         )
-        standings_rows = []
+        standings_rows = {}
     write_csv(os.path.join(outdir, "cl_2025_standings.csv"), standings_rows)
 
     # Teams for season 2025
@@ -238,7 +230,7 @@ def main() -> int:
         sys.stderr.write(
             f"Aviso: não foi possível obter times CL 2025: {e}\n"
         )
-        teams_rows = []
+        teams_rows = {}
     write_csv(os.path.join(outdir, "cl_2025_teams.csv"), teams_rows)
 
     # Matches in calendar year 2025
@@ -253,7 +245,7 @@ def main() -> int:
         sys.stderr.write(
             f"Aviso: não foi possível obter partidas CL no ano 2025: {e}\n"
         )
-        matches_rows = []
+        matches_rows = {}
     write_csv(os.path.join(outdir, "cl_2025_matches.csv"), matches_rows)
 
     # Top scorers for season 2025 (if available on plan)
@@ -265,7 +257,7 @@ def main() -> int:
     except RuntimeError as e:
         # Some plans may not include scorers; create empty if forbidden/not available
         sys.stderr.write(f"Aviso: não foi possível obter artilharia: {e}\n")
-        scorers_rows = []
+        scorers_rows = {}
     write_csv(os.path.join(outdir, "cl_2025_scorers.csv"), scorers_rows)
 
     # Summary JSON
@@ -281,10 +273,10 @@ def main() -> int:
         },
         "season": 2025,
         "counts": {
-            "standings_rows": len(standings_rows),
-            "teams": len(teams_rows),
-            "matches_2025": len(matches_rows),
-            "scorers": len(scorers_rows),
+            "standings_rows": row_count(standings_rows),
+            "teams": row_count(teams_rows),
+            "matches_2025": row_count(matches_rows),
+            "scorers": row_count(scorers_rows),
         },
         "files": {
             "standings_csv": os.path.join(outdir, "cl_2025_standings.csv"),
@@ -13,6 +13,9 @@ class Settings(BaseSettings):
 
     # DuckDB
     DUCKDB_PATH: str = "warehouse/warehouse.duckdb"
+    DUCKDB_THREADS: int | None = None  # None -> DuckDB's default (all cores)
+    DUCKDB_MEMORY_LIMIT: str | None = None  # None -> DuckDB's default (80% of RAM)
+    DUCKDB_PRESERVE_INSERTION_ORDER: bool = False
 
     # Misc
     PREFECT_LOGGING_LEVEL: str = "INFO"
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+
+
+def extract_columns(
+    records: Sequence[Mapping[str, Any] | None],
+    fields: Mapping[str, tuple[str, ...]],
+) -> dict[str, list[Any]]:
+    """Build one list per output column from key paths into each record.
+
+    Intermediate levels (e.g. ``score`` -> ``fullTime``) are extracted once and
+    shared by every column below them; missing or null levels yield None.
+    """
+    levels: dict[tuple[str, ...], list[Any]] = {(): list(records)}
+
+    def level(key_path: tuple[str, ...]) -> list[Any]:
+        values = levels.get(key_path)
+        if values is None:
+            key = key_path[-1]
+            values = [(parent or {}).get(key) for parent in level(key_path[:-1])]
+            levels[key_path] = values
+        return values
+
+    return {name: level(key_path) for name, key_path in fields.items()}
@@ -1,17 +1,55 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
-from typing import Iterable, Iterator
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator, Mapping
 
-import pandas as pd
+import pyarrow as pa
 import requests
 import time
+from requests.adapters import HTTPAdapter
 
 from footballdata.config import settings
+from footballdata.extract.flatten import extract_columns
 
 
 BASE_URL = settings.FOOTBALL_DATA_BASE_URL.rstrip("/")
 MAX_WINDOW_DAYS = 7
+MAX_WORKERS = 4
+REQUESTS_PER_MINUTE = 10
+RATE_LIMIT_BACKOFF_SECONDS = 60.0
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+class _TokenBucket:
+    """Thread-safe limiter keeping all workers under the API's per-minute quota."""
+
+    def __init__(self, rate_per_minute: int):
+        self._capacity = float(rate_per_minute)
+        self._tokens = float(rate_per_minute)
+        self._refill_per_second = rate_per_minute / 60.0
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated_at
+                self._tokens = min(self._capacity, self._tokens + elapsed * self._refill_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self._refill_per_second
+            time.sleep(wait_for)
+
+
+_RATE_LIMITER = _TokenBucket(REQUESTS_PER_MINUTE)
 
 
 def _headers() -> dict[str, str]:
@@ -21,6 +59,19 @@ def _headers() -> dict[str, str]:
     return headers
 
 
+def _session() -> requests.Session:
+    """Return the shared session, built on first use with the auth headers attached."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+                session.headers.update(_headers())
+                _SESSION = session
+    return _SESSION
+
+
 def _chunk_date_range(start: date, end: date, window_days: int = MAX_WINDOW_DAYS) -> Iterator[tuple[date, date]]:
     if window_days < 1:
         raise ValueError("window_days must be >= 1")
@@ -33,42 +84,144 @@ def _chunk_date_range(start: date, end: date, window_days: int = MAX_WINDOW_DAYS
         current = chunk_end + timedelta(days=1)
 
 
+# Key paths into a /matches item for every column silver.matches reads, keeping
+# the dotted names raw.matches has always used.
+_MATCH_FIELDS: dict[str, tuple[tuple[str, ...], pa.DataType]] = {
+    "id": (("id",), pa.int64()),
+    "utcDate": (("utcDate",), pa.string()),
+    "status": (("status",), pa.string()),
+    "stage": (("stage",), pa.string()),
+    "group": (("group",), pa.string()),
+    "matchday": (("matchday",), pa.int64()),
+    "season.id": (("season", "id"), pa.int64()),
+    "season.startDate": (("season", "startDate"), pa.string()),
+    "season.endDate": (("season", "endDate"), pa.string()),
+    "competition.id": (("competition", "id"), pa.int64()),
+    "competition.code": (("competition", "code"), pa.string()),
+    "competition.name": (("competition", "name"), pa.string()),
+    "area.name": (("area", "name"), pa.string()),
+    "homeTeam.id": (("homeTeam", "id"), pa.int64()),
+    "homeTeam.name": (("homeTeam", "name"), pa.string()),
+    "awayTeam.id": (("awayTeam", "id"), pa.int64()),
+    "awayTeam.name": (("awayTeam", "name"), pa.string()),
+    "score.fullTime.home": (("score", "fullTime", "home"), pa.int64()),
+    "score.fullTime.away": (("score", "fullTime", "away"), pa.int64()),
+    "score.winner": (("score", "winner"), pa.string()),
+    "lastUpdated": (("lastUpdated",), pa.string()),
+}
+_MATCH_KEY_PATHS = {name: key_path for name, (key_path, _) in _MATCH_FIELDS.items()}
+_EXTRACTED_AT_TYPE = pa.timestamp("us", tz="UTC")
+_MATCH_SCHEMA = pa.schema(
+    [(name, dtype) for name, (_, dtype) in _MATCH_FIELDS.items()]
+    + [("extracted_at", _EXTRACTED_AT_TYPE), ("source", pa.string())]
+)
+
+
+def _flatten_matches(matches: list[Mapping[str, Any]]) -> dict[str, list[Any]]:
+    return extract_columns(matches, _MATCH_KEY_PATHS)
+
+
+def _matches_to_arrow(matches: list[Mapping[str, Any]], extracted_at: datetime) -> pa.Table:
+    columns: dict[str, Any] = _flatten_matches(matches)
+    num_rows = len(matches)
+    columns["extracted_at"] = pa.repeat(pa.scalar(extracted_at, type=_EXTRACTED_AT_TYPE), num_rows)
+    columns["source"] = pa.repeat(pa.scalar("football-data.org"), num_rows)
+    return pa.table(columns, schema=_MATCH_SCHEMA)
+
+
+def _retry_after_seconds(resp: requests.Response) -> float:
+    # football-data.org reports the reset delay in X-RequestCounter-Reset; honor Retry-After first.
+    for header in ("Retry-After", "X-RequestCounter-Reset"):
+        try:
+            return max(float(resp.headers[header]), 0.0)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return RATE_LIMIT_BACKOFF_SECONDS
+
+
+def _fetch_window(
+    chunk_start: date,
+    chunk_end: date,
+    competitions: str | None,
+    extracted_at: datetime,
+) -> pa.Table | None:
+    params: dict[str, str] = {
+        "dateFrom": chunk_start.isoformat(),
+        "dateTo": chunk_end.isoformat(),
+    }
+    if competitions:
+        params["competitions"] = competitions
+
+    url = f"{BASE_URL}/matches"
+    session = _session()
+    _RATE_LIMITER.acquire()
+    resp = session.get(url, params=params, timeout=30)
+    if resp.status_code == 429:
+        # Respect rate limits: back off for the advertised delay and retry once
+        time.sleep(_retry_after_seconds(resp))
+        _RATE_LIMITER.acquire()
+        resp = session.get(url, params=params, timeout=30)
+    resp.raise_for_status()
+    payload = resp.json()
+    matches = payload.get("matches", [])
+
+    if not matches:
+        return None
+    return _matches_to_arrow(matches, extracted_at)
+
+
+def iter_matches_since(
+    since: datetime,
+    competitions: Iterable[str] | None = None,
+    until: datetime | None = None,
+) -> Iterator[pa.Table]:
+    """Yield one Arrow table per date window with matches, in window order.
+
+    Windows are fetched concurrently by a small thread pool sharing one session;
+    a process-wide token bucket keeps the pool within the API's request quota.
+    Each window is flattened into a fixed-schema Arrow table so DuckDB can scan
+    it without a pandas round trip or type inference, and callers can load it
+    while later windows are still in flight.
+    """
+
+    # One extraction timestamp per run, shared by every window.
+    extracted_at = datetime.now(timezone.utc)
+    start_date = since.date()
+    end_date = (until or (extracted_at + timedelta(days=1))).date()
+    competitions_param = ",".join(competitions) if competitions else None
+    windows = list(_chunk_date_range(start_date, end_date))
+
+    # Keep at most MAX_WORKERS windows queued so a failure stops extraction promptly
+    # instead of waiting for every remaining window to be fetched.
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    window_iter = iter(windows)
+    pending: deque[Future[pa.Table | None]] = deque()
+    try:
+        for window in window_iter:
+            pending.append(executor.submit(_fetch_window, *window, competitions_param, extracted_at))
+            if len(pending) >= MAX_WORKERS:
+                break
+        while pending:
+            chunk_tbl = pending.popleft().result()
+            for window in window_iter:
+                pending.append(executor.submit(_fetch_window, *window, competitions_param, extracted_at))
+                break
+            if chunk_tbl is not None:
+                yield chunk_tbl
+    finally:
+        # Runs on exhaustion, error, or when the consumer abandons the generator: drop
+        # queued windows and don't block on requests already in flight.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def fetch_matches_since(
     since: datetime,
     competitions: Iterable[str] | None = None,
     until: datetime | None = None,
-) -> pd.DataFrame:
+) -> pa.Table:
     """Fetch matches updated since a date, chunking requests to meet API limits."""
 
-    start_date = since.date()
-    end_date = (until or (datetime.utcnow() + timedelta(days=1))).date()
-    all_frames: list[pd.DataFrame] = []
-
-    for chunk_start, chunk_end in _chunk_date_range(start_date, end_date):
-        params: dict[str, str] = {
-            "dateFrom": chunk_start.isoformat(),
-            "dateTo": chunk_end.isoformat(),
-        }
-        if competitions:
-            params["competitions"] = ",".join(competitions)
-
-        url = f"{BASE_URL}/matches"
-        resp = requests.get(url, headers=_headers(), params=params, timeout=30)
-        if resp.status_code == 429:
-            # Respect rate limits: back off and retry once after waiting
-            time.sleep(60)
-            resp = requests.get(url, headers=_headers(), params=params, timeout=30)
-        resp.raise_for_status()
-        payload = resp.json()
-        matches = payload.get("matches", [])
-
-        if not matches:
-            continue
-        chunk_df = pd.json_normalize(matches)
-        chunk_df["extracted_at"] = pd.Timestamp.utcnow()
-        chunk_df["source"] = "football-data.org"
-        all_frames.append(chunk_df)
-
-    if not all_frames:
-        return pd.DataFrame()
-    return pd.concat(all_frames, ignore_index=True)
+    all_tables = list(iter_matches_since(since, competitions=competitions, until=until))
+    if not all_tables:
+        return pa.table({})
+    return pa.concat_tables(all_tables)
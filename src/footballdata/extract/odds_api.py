@@ -6,6 +6,7 @@ from typing import Iterable
 import pandas as pd
 import requests
 import time
+from requests.adapters import HTTPAdapter
 
 from footballdata.config import settings
 
@@ -28,9 +29,13 @@ class OddsAPIMeta:
 
 
 BASE_URL = settings.ODDS_API_BASE_URL.rstrip("/")
+CONSENSUS_KEYS = ["event_id", "market_key", "outcome_name", "outcome_point"]
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2
 
+# Retries are handled by _get, so the adapter only pools connections.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
 
 def _build_meta(headers: requests.structures.CaseInsensitiveDict[str]) -> OddsAPIMeta:
@@ -49,10 +54,15 @@ def _build_meta(headers: requests.structures.CaseInsensitiveDict[str]) -> OddsAP
     )
 
 
-def _get(path: str, params: dict[str, str]) -> tuple[list[dict], OddsAPIMeta]:
+def _get(
+    path: str,
+    params: dict[str, str],
+    session: requests.Session | None = None,
+) -> tuple[list[dict], OddsAPIMeta]:
     if not settings.ODDS_API_KEY:
         raise OddsAPIError("ODDS_API_KEY n?o configurada. Atualize o arquivo .env.")
 
+    http = session or _SESSION
     url = f"{BASE_URL}{path}"
     merged_params = dict(params)
     merged_params["apiKey"] = settings.ODDS_API_KEY
@@ -72,7 +82,7 @@ def _get(path: str, params: dict[str, str]) -> tuple[list[dict], OddsAPIMeta]:
     while True:
         attempts += 1
         try:
-            resp = requests.get(url, params=merged_params, timeout=30)
+            resp = http.get(url, params=merged_params, timeout=30)
             resp.raise_for_status()
         except requests.HTTPError as exc:
             status = exc.response.status_code if exc.response is not None else None
@@ -113,11 +123,13 @@ def fetch_champions_league_odds(
     date_format: str = "iso",
     include_links: bool | None = None,
     sport_key: str | None = None,
+    session: requests.Session | None = None,
 ) -> tuple[pd.DataFrame, OddsAPIMeta]:
     """
     Fetch odds for UEFA Champions League fixtures using The Odds API.
 
     Returns a tuple containing the flattened DataFrame and quota metadata.
+    A custom ``session`` may be passed to reuse an existing connection pool.
     """
 
     markets_param = ",".join(markets) if markets else "h2h"
@@ -131,37 +143,99 @@ def fetch_champions_league_odds(
         params["includeLinks"] = str(include_links).lower()
 
     key = sport_key or settings.ODDS_API_SPORT_KEY
-    payload, meta = _get(f"/sports/{key}/odds/", params=params)
+    payload, meta = _get(f"/sports/{key}/odds/", params=params, session=session)
+
+    event_id_col: list = []
+    sport_key_col: list = []
+    commence_time_col: list = []
+    home_team_col: list = []
+    away_team_col: list = []
+    bookmaker_key_col: list = []
+    bookmaker_title_col: list = []
+    bookmaker_last_update_col: list = []
+    market_key_col: list = []
+    outcome_name_col: list = []
+    outcome_price_col: list = []
+    outcome_point_col: list = []
+    outcome_description_col: list = []
 
-    records: list[dict] = []
     for event in payload:
-        commence_time = pd.to_datetime(event.get("commence_time"), utc=True, errors="coerce")
+        event_id = event.get("id")
+        event_sport_key = event.get("sport_key")
+        commence_time = event.get("commence_time")
+        home_team = event.get("home_team")
+        away_team = event.get("away_team")
         for bookmaker in event.get("bookmakers", []):
-            bookmaker_last_update = pd.to_datetime(bookmaker.get("last_update"), utc=True, errors="coerce")
+            bookmaker_key = bookmaker.get("key")
+            bookmaker_title = bookmaker.get("title")
+            bookmaker_last_update = bookmaker.get("last_update")
             for market in bookmaker.get("markets", []):
                 market_key = market.get("key")
                 if market_key is None:
                     continue
                 for outcome in market.get("outcomes", []):
-                    records.append(
-                        {
-                            "event_id": event.get("id"),
-                            "sport_key": event.get("sport_key"),
-                            "commence_time": commence_time,
-                            "home_team": event.get("home_team"),
-                            "away_team": event.get("away_team"),
-                            "bookmaker_key": bookmaker.get("key"),
-                            "bookmaker_title": bookmaker.get("title"),
-                            "bookmaker_last_update": bookmaker_last_update,
-                            "market_key": market_key,
-                            "outcome_name": outcome.get("name"),
-                            "outcome_price": outcome.get("price"),
-                            "outcome_point": outcome.get("point"),
-                            "outcome_description": outcome.get("description"),
-                        }
-                    )
-
-    return pd.DataFrame.from_records(records), meta
+                    event_id_col.append(event_id)
+                    sport_key_col.append(event_sport_key)
+                    commence_time_col.append(commence_time)
+                    home_team_col.append(home_team)
+                    away_team_col.append(away_team)
+                    bookmaker_key_col.append(bookmaker_key)
+                    bookmaker_title_col.append(bookmaker_title)
+                    bookmaker_last_update_col.append(bookmaker_last_update)
+                    market_key_col.append(market_key)
+                    outcome_name_col.append(outcome.get("name"))
+                    outcome_price_col.append(outcome.get("price"))
+                    outcome_point_col.append(outcome.get("point"))
+                    outcome_description_col.append(outcome.get("description"))
+
+    # Timestamps are parsed once per column; ISO strings skip per-value format inference.
+    time_format = "ISO8601" if date_format == "iso" else None
+    odds_df = pd.DataFrame(
+        {
+            "event_id": event_id_col,
+            "sport_key": sport_key_col,
+            "commence_time": pd.to_datetime(commence_time_col, utc=True, errors="coerce", format=time_format),
+            "home_team": home_team_col,
+            "away_team": away_team_col,
+            "bookmaker_key": bookmaker_key_col,
+            "bookmaker_title": bookmaker_title_col,
+            "bookmaker_last_update": pd.to_datetime(
+                bookmaker_last_update_col, utc=True, errors="coerce", format=time_format
+            ),
+            "market_key": market_key_col,
+            "outcome_name": outcome_name_col,
+            "outcome_price": outcome_price_col,
+            "outcome_point": outcome_point_col,
+            "outcome_description": outcome_description_col,
+        }
+    )
+    return odds_df, meta
+
+
+def summarize_odds_consensus(odds_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse per-bookmaker odds into one row per event, market, outcome and line.
+
+    Each row carries the median price, the number of bookmakers quoting it and
+    the latest bookmaker update.
+    """
+
+    if odds_df.empty:
+        return pd.DataFrame()
+    # Categorical codes make the per-group bookmaker nunique an integer count.
+    odds_df = odds_df.astype({"bookmaker_key": "category"})
+    return (
+        odds_df.groupby(CONSENSUS_KEYS, sort=False, dropna=False, observed=True)
+        .agg(
+            commence_time=("commence_time", "max"),
+            home_team=("home_team", "first"),
+            away_team=("away_team", "first"),
+            price_median=("outcome_price", "median"),
+            bookmaker_count=("bookmaker_key", "nunique"),
+            last_update=("bookmaker_last_update", "max"),
+        )
+        .reset_index()
+    )
 
 
 __all__ = [
@@ -169,4 +243,5 @@ __all__ = [
     "OddsAPIHTTPError",
     "OddsAPIMeta",
     "fetch_champions_league_odds",
+    "summarize_odds_consensus",
 ]
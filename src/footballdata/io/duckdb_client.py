@@ -1,19 +1,96 @@
 from __future__ import annotations
 
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, Mapping
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
 
 from footballdata.config import settings
 
 
+def _quote_identifier(identifier: str) -> str:
+    escaped = identifier.replace('"', '""')
+    return f'"{escaped}"'
+
+
+@lru_cache(maxsize=32)
+def _read_sql_file(path: str) -> str:
+    # SQL files ship with the repo and don't change while a flow runs.
+    return Path(path).read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=32)
+def _merge_sql(table: str, key_cols: tuple[str, ...], cols: tuple[str, ...]) -> str:
+    q = _quote_identifier
+    on_clause = " AND ".join([f"t.{q(c)} = s.{q(c)}" for c in key_cols])
+    update_set = ", ".join([f"{q(c)} = s.{q(c)}" for c in cols if c not in key_cols])
+    insert_cols = ", ".join([q(c) for c in cols])
+    insert_vals = ", ".join([f"s.{q(c)}" for c in cols])
+    return f"""
+        MERGE INTO {table} t
+        USING incoming_upd s
+        ON {on_clause}
+        WHEN MATCHED THEN UPDATE SET {update_set}
+        WHEN NOT MATCHED THEN INSERT ({insert_cols}) VALUES ({insert_vals});
+    """
+
+
+UPSERT_BATCH_ROWS = 10_000
+# Row-number column used while a load is staged; never written to the target table.
+_STAGE_ROW = "__upsert_row"
+
+
+def _configure(con: duckdb.DuckDBPyConnection) -> None:
+    # These are database-wide, so setting them once on the shared connection covers every cursor.
+    # Threads and memory are only overridden when configured; DuckDB sizes both to the host.
+    if settings.DUCKDB_THREADS:
+        con.execute(f"PRAGMA threads={int(settings.DUCKDB_THREADS)}")
+    if settings.DUCKDB_MEMORY_LIMIT:
+        memory_limit = settings.DUCKDB_MEMORY_LIMIT.replace("'", "''")
+        con.execute(f"PRAGMA memory_limit='{memory_limit}'")
+    preserve_order = "true" if settings.DUCKDB_PRESERVE_INSERTION_ORDER else "false"
+    con.execute(f"PRAGMA preserve_insertion_order={preserve_order}")
+
+
+# One connection per database file, with whether it was opened read-only: DuckDB refuses a
+# second connection to the same file with a different configuration.
+_CONNECTIONS: dict[str, tuple[duckdb.DuckDBPyConnection, bool]] = {}
+_CONNECTIONS_LOCK = threading.Lock()
+# Column names per (db_path, table), shared by every client; also guarded by _CONNECTIONS_LOCK.
+_SCHEMA_CACHE: dict[tuple[str, str], frozenset[str]] = {}
+
+
 class DuckDB:
     def __init__(self, db_path: str | None = None, read_only: bool = False):
         self.db_path = db_path or settings.DUCKDB_PATH
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._con = duckdb.connect(self.db_path, read_only=read_only)
+        # Each client gets its own cursor over the shared connection: cursors are
+        # safe to use from separate threads and keep temp tables/views isolated.
+        self._con = self.get_connection(self.db_path, read_only).cursor()
+
+    @classmethod
+    def get_connection(cls, db_path: str | None = None, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+        """Return the process-wide connection for ``db_path``, opening it on first use.
+
+        A read-only request reuses an already open read-write connection; asking for
+        read-write access to a file first opened read-only raises ``ValueError``.
+        """
+        path = db_path or settings.DUCKDB_PATH
+        with _CONNECTIONS_LOCK:
+            cached = _CONNECTIONS.get(path)
+            if cached is None:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                con = duckdb.connect(path, read_only=read_only)
+                _configure(con)
+                _CONNECTIONS[path] = (con, read_only)
+                return con
+        con, opened_read_only = cached
+        if opened_read_only and not read_only:
+            raise ValueError(f"{path} is already open read-only in this process; open it read-write first.")
+        return con
 
     @property
     def con(self) -> duckdb.DuckDBPyConnection:
@@ -23,53 +100,111 @@ class DuckDB:
         self._con.execute(sql)
 
     def exec_sql_file(self, path: str | Path) -> None:
-        sql = Path(path).read_text(encoding="utf-8")
-        self.exec_sql(sql)
+        self.exec_sql(_read_sql_file(str(path)))
+
+    def exec_sql_files(self, paths: Iterable[str | Path]) -> None:
+        """Run several SQL files, in order, as one multi-statement execute."""
+        # The newline guards against a file ending in a comment swallowing the separator.
+        self.exec_sql("\n;\n".join(_read_sql_file(str(path)) for path in paths))
 
     def _quote(self, identifier: str) -> str:
-        escaped = identifier.replace('"', '""')
-        return f'"{escaped}"'
+        return _quote_identifier(identifier)
 
-    def _ensure_columns(self, table: str) -> None:
+    def _ensure_columns(self, table: str, cols: list[str]) -> None:
         """Add any missing columns so MERGE doesn't fail when schema evolves."""
-        incoming_cols = {row[0]: row[1] for row in self._con.execute("DESCRIBE incoming").fetchall()}
-        table_cols = {row[0]: row[1] for row in self._con.execute(f"DESCRIBE {table}").fetchall()}
-
-        missing = [(name, dtype) for name, dtype in incoming_cols.items() if name not in table_cols]
-        for name, dtype in missing:
-            self._con.execute(f"ALTER TABLE {table} ADD COLUMN {self._quote(name)} {dtype}")
-
-    def upsert_df(self, table: str, df: pd.DataFrame | Iterable[Mapping], key_cols: list[str]) -> tuple[int, int]:
-        if not isinstance(df, pd.DataFrame):
-            df = pd.DataFrame(df)
-        if df.empty:
+        cache_key = (self.db_path, table)
+        with _CONNECTIONS_LOCK:
+            table_cols = _SCHEMA_CACHE.get(cache_key)
+        if table_cols is None:
+            table_cols = frozenset(row[0] for row in self._con.execute(f"DESCRIBE {table}").fetchall())
+            with _CONNECTIONS_LOCK:
+                _SCHEMA_CACHE[cache_key] = table_cols
+
+        missing = [name for name in cols if name not in table_cols]
+        if not missing:
+            return
+
+        # Types come from the registered view's metadata, which DuckDB binds without running a query.
+        incoming = self._con.view("incoming")
+        incoming_types = dict(zip(incoming.columns, incoming.types))
+        try:
+            for name in missing:
+                self._con.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {self._quote(name)} {incoming_types[name]}")
+        finally:
+            # Re-read the schema next time rather than patching a set other clients may hold.
+            with _CONNECTIONS_LOCK:
+                _SCHEMA_CACHE.pop(cache_key, None)
+
+    def upsert_df(
+        self, table: str, df: pd.DataFrame | pa.Table | Iterable[Mapping], key_cols: list[str]
+    ) -> tuple[int, int]:
+        if isinstance(df, pa.Table):
+            num_rows = df.num_rows
+            cols = list(df.column_names)
+        else:
+            if not isinstance(df, pd.DataFrame):
+                df = pd.DataFrame(df)
+            num_rows = len(df)
+            cols = list(df.columns)
+        if num_rows == 0:
             return 0, 0
 
-        # Register incoming data as a DuckDB view
+        # Register incoming data as a DuckDB view (pandas and Arrow are both scanned in place)
         self._con.register("incoming", df)
 
         # Ensure table exists with the incoming schema (first time)
         self._con.execute(f"CREATE TABLE IF NOT EXISTS {table} AS SELECT * FROM incoming LIMIT 0;")
-        self._ensure_columns(table)
-
-        cols = [c for c in df.columns]
-        on_clause = " AND ".join([f"t.{self._quote(c)} = s.{self._quote(c)}" for c in key_cols])
-        update_set = ", ".join([f"{self._quote(c)} = s.{self._quote(c)}" for c in cols if c not in key_cols])
-        insert_cols = ", ".join([self._quote(c) for c in cols])
-        insert_vals = ", ".join([f"s.{self._quote(c)}" for c in cols])
-
-        merge_sql = f"""
-            MERGE INTO {table} t
-            USING incoming s
-            ON {on_clause}
-            WHEN MATCHED THEN UPDATE SET {update_set}
-            WHEN NOT MATCHED THEN INSERT ({insert_cols}) VALUES ({insert_vals});
-        """
-
-        res = self._con.execute(merge_sql).fetchall()
-        # DuckDB MERGE returns no row counts; we can approximate by comparing counts before/after if needed.
-        # Here, return (0, 0) as unknown to keep interface stable.
-        return 0, 0
+        self._ensure_columns(table, cols)
+
+        # Stage the load sorted by key with DuckDB's parallel sort, so MERGE's index probes run
+        # sequentially; the row number lets large loads be sliced in key order.
+        order_by = ", ".join([self._quote(c) for c in key_cols])
+        self._con.execute(
+            f"CREATE OR REPLACE TEMP TABLE incoming_sorted AS "
+            f"SELECT *, row_number() OVER (ORDER BY {order_by}) AS {_STAGE_ROW} FROM incoming;"
+        )
+        self._con.unregister("incoming")
+
+        inserted = updated = 0
+        # Large loads are applied in fixed-size slices so each MERGE stays at a cache-friendly size.
+        for offset in range(0, num_rows, UPSERT_BATCH_ROWS):
+            self._con.execute(
+                f"CREATE OR REPLACE TEMP VIEW incoming_batch AS SELECT * FROM incoming_sorted "
+                f"WHERE {_STAGE_ROW} > {offset} AND {_STAGE_ROW} <= {offset + UPSERT_BATCH_ROWS};"
+            )
+            batch_inserted, batch_updated = self._upsert_batch(table, key_cols, cols)
+            inserted += batch_inserted
+            updated += batch_updated
+
+        self._con.execute("DROP VIEW IF EXISTS incoming_batch;")
+        self._con.execute("DROP TABLE IF EXISTS incoming_sorted;")
+        return inserted, updated
+
+    def _upsert_batch(self, table: str, key_cols: list[str], cols: list[str]) -> tuple[int, int]:
+        # Split the batch: keys not yet in the table are bulk-inserted, only the rest go through MERGE.
+        using_cols = ", ".join([self._quote(c) for c in key_cols])
+        self._con.execute(
+            f"CREATE OR REPLACE TEMP TABLE incoming_new AS "
+            f"SELECT s.* EXCLUDE ({_STAGE_ROW}) FROM incoming_batch s ANTI JOIN {table} t USING ({using_cols}) "
+            f"ORDER BY s.{_STAGE_ROW};"
+        )
+        self._con.execute(
+            f"CREATE OR REPLACE TEMP TABLE incoming_upd AS "
+            f"SELECT s.* EXCLUDE ({_STAGE_ROW}) FROM incoming_batch s SEMI JOIN {table} t USING ({using_cols}) "
+            f"ORDER BY s.{_STAGE_ROW};"
+        )
+        inserted = self._con.execute("SELECT COUNT(*) FROM incoming_new").fetchone()[0]
+        updated = self._con.execute("SELECT COUNT(*) FROM incoming_upd").fetchone()[0]
+
+        if inserted:
+            self._con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM incoming_new;")
+
+        if updated:
+            self._con.execute(_merge_sql(table, tuple(key_cols), tuple(cols)))
+
+        self._con.execute("DROP TABLE IF EXISTS incoming_new;")
+        self._con.execute("DROP TABLE IF EXISTS incoming_upd;")
+        return inserted, updated
 
 
 def init_schemas() -> None:
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import pandas as pd
+import pyarrow as pa
 
 
-def ensure_dtypes_matches(df: pd.DataFrame) -> pd.DataFrame:
+def ensure_dtypes_matches(df: pd.DataFrame | pa.Table) -> pd.DataFrame | pa.Table:
     """Optional light Python normalization for raw matches before SQL stage.
     This is a placeholder for adjustments like timestamp parsing, etc.
     """
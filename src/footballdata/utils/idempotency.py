@@ -1,14 +1,65 @@
 from __future__ import annotations
 
+import threading
 from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+from typing import Final, Iterable
 
 from footballdata.io.duckdb_client import DuckDB
 
 
 TABLE = "meta.ingestion_watermarks_v2"
-
-
+_EPOCH: Final[datetime] = datetime(1970, 1, 1)
+
+_SQL_HWM = "SELECT high_watermark FROM meta.ingestion_watermarks_v2 WHERE source = ? AND entity = ? AND key = ?"
+_SQL_LSA = "SELECT last_success_at FROM meta.ingestion_watermarks_v2 WHERE source = ? AND entity = ? AND key = ?"
+_READ_SQLS = (_SQL_HWM, _SQL_LSA)
+
+_UPSERT_SQL = """
+    INSERT INTO meta.ingestion_watermarks_v2 AS t
+        (source, entity, key, last_success_at, high_watermark, updated_at)
+    VALUES (?, ?, ?, ?, ?, now())
+    ON CONFLICT (source, entity, key) DO UPDATE SET
+        last_success_at = COALESCE(excluded.last_success_at, t.last_success_at),
+        high_watermark = COALESCE(excluded.high_watermark, t.high_watermark),
+        updated_at = now();
+"""
+
+# Both values supplied: overwrite outright, no COALESCE against the stored row.
+_UPSERT_BOTH_SQL = """
+    INSERT INTO meta.ingestion_watermarks_v2
+        (source, entity, key, last_success_at, high_watermark, updated_at)
+    VALUES (?, ?, ?, ?, ?, now())
+    ON CONFLICT (source, entity, key) DO UPDATE SET
+        last_success_at = excluded.last_success_at,
+        high_watermark = excluded.high_watermark,
+        updated_at = now();
+"""
+
+# Reads are cached per (statement, source, entity, key); writes drop the affected entries.
+# Prefect task threads share the cache, so every access goes through _VALUE_CACHE_LOCK.
+_VALUE_CACHE: dict[tuple[str, str, str, str], datetime | None] = {}
+_VALUE_CACHE_LOCK = threading.Lock()
+# Bumped by every invalidation; a read only fills the cache if no write landed while it ran.
+_VALUE_CACHE_GENERATION = 0
+
+
+_TLS = threading.local()
+
+
+def _con():
+    # One client per thread: DuckDB() hands out its own cursor over the shared
+    # connection, so concurrent Prefect task threads don't share statement state.
+    con = getattr(_TLS, "con", None)
+    if con is None:
+        con = _TLS.con = DuckDB().con
+    return con
+
+
+@lru_cache(maxsize=32)
 def _ensure_table(con) -> None:
+    # Memoized per connection: the DDL only needs to run once; call _ensure_table.cache_clear() after a reset.
     con.execute("CREATE SCHEMA IF NOT EXISTS meta;")
     con.execute(
         """
@@ -25,16 +76,28 @@ def _ensure_table(con) -> None:
     )
 
 
-def _get_value(source: str, entity: str, key: str, column: str) -> datetime | None:
-    con = DuckDB().con
+def invalidate_watermark_cache() -> None:
+    """Forget cached watermark reads, e.g. at task boundaries or after writes from another process."""
+    global _VALUE_CACHE_GENERATION
+    with _VALUE_CACHE_LOCK:
+        _VALUE_CACHE.clear()
+        _VALUE_CACHE_GENERATION += 1
+
+
+def _fetch(sql: str, source: str, entity: str, key: str) -> datetime | None:
+    cache_key = (sql, source, entity, key)
+    with _VALUE_CACHE_LOCK:
+        if cache_key in _VALUE_CACHE:
+            return _VALUE_CACHE[cache_key]
+        generation = _VALUE_CACHE_GENERATION
+    con = _con()
     _ensure_table(con)
-    row = con.execute(
-        f"SELECT {column} FROM {TABLE} WHERE source = ? AND entity = ? AND key = ?",
-        [source, entity, key],
-    ).fetchone()
-    if row and row[0] is not None:
-        return row[0]
-    return None
+    row = con.execute(sql, [source, entity, key]).fetchone()
+    value = row[0] if row else None
+    with _VALUE_CACHE_LOCK:
+        if generation == _VALUE_CACHE_GENERATION:
+            _VALUE_CACHE[cache_key] = value
+    return value
 
 
 def get_high_watermark(
@@ -43,10 +106,8 @@ def get_high_watermark(
     key: str = "global",
     default: datetime | None = None,
 ) -> datetime:
-    value = _get_value(source, entity, key, "high_watermark")
-    if value is not None:
-        return value
-    return default or datetime(1970, 1, 1)
+    value = _fetch(_SQL_HWM, source, entity, key)
+    return value if value is not None else (default or _EPOCH)
 
 
 def get_last_success_at(
@@ -55,10 +116,22 @@ def get_last_success_at(
     key: str = "global",
     default: datetime | None = None,
 ) -> datetime:
-    value = _get_value(source, entity, key, "last_success_at")
-    if value is not None:
-        return value
-    return default or datetime(1970, 1, 1)
+    value = _fetch(_SQL_LSA, source, entity, key)
+    return value if value is not None else (default or _EPOCH)
+
+
+def _upsert_sql(last_success_at: datetime | None, high_watermark: datetime | None) -> str:
+    if last_success_at is not None and high_watermark is not None:
+        return _UPSERT_BOTH_SQL
+    return _UPSERT_SQL
+
+
+def _invalidate(source: str, entity: str, key: str) -> None:
+    global _VALUE_CACHE_GENERATION
+    with _VALUE_CACHE_LOCK:
+        for sql in _READ_SQLS:
+            _VALUE_CACHE.pop((sql, source, entity, key), None)
+        _VALUE_CACHE_GENERATION += 1
 
 
 def set_watermarks(
@@ -68,22 +141,39 @@ def set_watermarks(
     last_success_at: datetime | None = None,
     high_watermark: datetime | None = None,
 ) -> None:
-    con = DuckDB().con
+    con = _con()
     _ensure_table(con)
-    con.execute(
-        """
-        INSERT INTO meta.ingestion_watermarks_v2 AS t
-            (source, entity, key, last_success_at, high_watermark, updated_at)
-        VALUES (?, ?, ?, ?, ?, now())
-        ON CONFLICT (source, entity, key) DO UPDATE SET
-            last_success_at = COALESCE(excluded.last_success_at, t.last_success_at),
-            high_watermark = COALESCE(excluded.high_watermark, t.high_watermark),
-            updated_at = now();
-        """,
-        [source, entity, key, last_success_at, high_watermark],
-    )
+    con.execute(_upsert_sql(last_success_at, high_watermark), [source, entity, key, last_success_at, high_watermark])
+    _invalidate(source, entity, key)
 
 
+def set_watermarks_bulk(
+    rows: Iterable[tuple[str, str, str, datetime | None, datetime | None]],
+) -> None:
+    """Upsert many ``(source, entity, key, last_success_at, high_watermark)`` rows in one transaction.
+
+    ``None`` values keep the stored value, as in :func:`set_watermarks`.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    con = _con()
+    _ensure_table(con)
+    con.begin()
+    try:
+        # Consecutive rows sharing a statement go in one executemany; row order is preserved.
+        for sql, group in groupby(rows, key=lambda row: _upsert_sql(row[3], row[4])):
+            con.executemany(sql, list(group))
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    for source, entity, key, _, _ in rows:
+        _invalidate(source, entity, key)
+
+
+# Single-field wrappers; when both values change, prefer one set_watermarks (or
+# set_watermarks_bulk) call so they land in a single upsert.
 def set_last_success_at(
     source: str,
     entity: str,
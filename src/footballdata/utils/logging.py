@@ -2,14 +2,25 @@ import logging
 import os
 
 
+# Resolved once at import; loggers configured here are tagged so repeat calls return early.
+_LEVEL = os.getenv("PREFECT_LOGGING_LEVEL", "INFO").upper()
+# Numeric level, so setLevel skips its name lookup; unknown names fall back to INFO.
+# (getLevelName maps known names to ints; getLevelNamesMapping would need Python 3.11.)
+_LEVEL_INT = logging.getLevelName(_LEVEL)
+if not isinstance(_LEVEL_INT, int):
+    _LEVEL_INT = logging.INFO
+_CONFIGURED_ATTR = "_fd_configured"
+_FORMATTER = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
 def get_logger(name: str) -> logging.Logger:
-    level = os.getenv("PREFECT_LOGGING_LEVEL", "INFO").upper()
     logger = logging.getLogger(name)
+    if getattr(logger, _CONFIGURED_ATTR, False):
+        return logger
     if not logger.handlers:
         handler = logging.StreamHandler()
-        fmt = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        handler.setFormatter(fmt)
+        handler.setFormatter(_FORMATTER)
         logger.addHandler(handler)
-    logger.setLevel(level)
+    logger.setLevel(_LEVEL_INT)
+    setattr(logger, _CONFIGURED_ATTR, True)
     return logger
-
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from footballdata.io.duckdb_client import DuckDB
+from footballdata.utils import idempotency
+
+
+class _Row:
+    def __init__(self, row):
+        self._row = row
+
+    def fetchone(self):
+        return self._row
+
+
+class _PausingCursor:
+    """Cursor wrapper that can park a watermark read after the query but before the caller sees it."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.read_done: threading.Event | None = None
+        self.release: threading.Event | None = None
+
+    def execute(self, sql, params=None):
+        result = self._cursor.execute(sql) if params is None else self._cursor.execute(sql, params)
+        if self.read_done is not None and sql in idempotency._READ_SQLS:
+            row = result.fetchone()
+            self.read_done.set()
+            self.release.wait(timeout=5)
+            return _Row(row)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+@pytest.fixture()
+def cursors(tmp_path, monkeypatch):
+    path = str(tmp_path / "watermarks.duckdb")
+    local = threading.local()
+
+    def con():
+        if not hasattr(local, "con"):
+            local.con = _PausingCursor(DuckDB(path).con)
+        return local.con
+
+    monkeypatch.setattr(idempotency, "_con", con)
+    idempotency.invalidate_watermark_cache()
+    yield con
+    idempotency.invalidate_watermark_cache()
+
+
+def test_cached_read_is_dropped_by_write(cursors):
+    idempotency.set_watermarks("src", "matches", high_watermark=datetime(2025, 1, 1))
+    assert idempotency.get_high_watermark("src", "matches") == datetime(2025, 1, 1)
+
+    idempotency.set_watermarks("src", "matches", high_watermark=datetime(2025, 2, 1))
+    assert idempotency.get_high_watermark("src", "matches") == datetime(2025, 2, 1)
+
+
+def test_read_racing_a_write_does_not_cache_the_old_value(cursors):
+    old, new = datetime(2025, 1, 1), datetime(2025, 2, 1)
+    idempotency.set_watermarks("src", "matches", high_watermark=old)
+    idempotency.invalidate_watermark_cache()
+
+    read_done, release = threading.Event(), threading.Event()
+    seen: list[datetime] = []
+
+    def reader():
+        con = cursors()
+        con.read_done, con.release = read_done, release
+        seen.append(idempotency.get_high_watermark("src", "matches"))
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    assert read_done.wait(timeout=5)
+    # The reader has fetched the old row but not stored it yet; land a write in between.
+    idempotency.set_watermarks("src", "matches", high_watermark=new)
+    release.set()
+    thread.join(timeout=5)
+
+    assert seen == [old]
+    assert idempotency.get_high_watermark("src", "matches") == new